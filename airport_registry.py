@@ -0,0 +1,88 @@
+import bisect
+import difflib
+import sys
+
+
+class RegistroAeropuertos:
+    """
+    Registro de los códigos IATA conocidos, construido una vez al cargar los datos.
+
+    Cada código recibe un id entero denso (0..n-1) en orden alfabético, así que comparar
+    ids da el mismo orden que comparar códigos: una búsqueda sobre ids desempata igual
+    que la misma búsqueda sobre strings. Los ids sirven de índice común para el grafo
+    (listas de adyacencia), las reglas de visa (bitsets) y cualquier caché.
+    """
+
+    def __init__(self, codigos):
+        self.codigos: list[str] = sorted({sys.intern(codigo) for codigo in codigos})
+        self.ids: dict[str, int] = {codigo: i for i, codigo in enumerate(self.codigos)}
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def __contains__(self, codigo):
+        return codigo in self.ids
+
+    def __iter__(self):
+        return iter(self.codigos)
+
+    @staticmethod
+    def normalizar(texto: str) -> str:
+        """Normaliza lo que escribe el usuario: sin espacios y en mayúsculas."""
+        return texto.strip().upper()
+
+    def id(self, codigo: str) -> int:
+        """
+        Raises:
+            KeyError: Si el código no está registrado
+        """
+        return self.ids[codigo]
+
+    def codigo(self, id_aeropuerto: int) -> str:
+        return self.codigos[id_aeropuerto]
+
+    def validar(self, texto: str) -> int | None:
+        """Id del aeropuerto escrito (normalizado), o None si no existe."""
+        return self.ids.get(self.normalizar(texto))
+
+    def buscar_prefijo(self, prefijo: str, limite: int = 10) -> list[str]:
+        """Códigos que empiezan por el prefijo, en orden alfabético (búsqueda binaria)."""
+        prefijo = self.normalizar(prefijo)
+        inicio = bisect.bisect_left(self.codigos, prefijo)
+        resultado = []
+        for codigo in self.codigos[inicio:inicio + limite]:
+            if not codigo.startswith(prefijo):
+                break
+            resultado.append(codigo)
+        return resultado
+
+    def sugerencias(self, texto: str, limite: int = 3) -> list[str]:
+        """
+        Códigos parecidos a un texto inválido: primero los que empiezan igual y luego
+        los más parecidos (difflib), sin repetir.
+        """
+        texto = self.normalizar(texto)
+        if not texto:
+            return []
+        resultado = self.buscar_prefijo(texto, limite)
+        for codigo in difflib.get_close_matches(texto, self.codigos, n=limite, cutoff=0.6):
+            if len(resultado) >= limite:
+                break
+            if codigo not in resultado:
+                resultado.append(codigo)
+        return resultado
+
+    def a_ids(self, grafo: dict[str, list[tuple[str, float]]]) -> list[list[tuple[int, float]]]:
+        """
+        Convierte un grafo {código: [(destino, precio), ...]} en listas de adyacencia
+        indexadas por id. Los aeropuertos que no están en el grafo quedan sin conexiones.
+        """
+        ids = self.ids
+        adyacencia = [[] for _ in self.codigos]
+        for origen, conexiones in grafo.items():
+            adyacencia[ids[origen]] = [(ids[destino], precio) for destino, precio in conexiones]
+        return adyacencia
+
+    def a_codigos(self, ruta: list[int]) -> list[str]:
+        codigos = self.codigos
+        return [codigos[i] for i in ruta]
@@ -0,0 +1,216 @@
+import heapq
+import os
+import random
+import sys
+import time
+
+from airport_registry import RegistroAeropuertos
+from graph_index import DatosIndexados
+from pathfinder import construir_grafo, encontrar_ruta_mas_barata, encontrar_ruta_mas_barata_ids
+from parallel_search import resolver_lote
+from synthetic_graphs import generar_codigos, generar_tarifas, generar_visas
+import vectorized_backend
+from differential_check import benchmark_diferencial
+
+# Suite de benchmarks. Uso:
+#   python benchmarks.py                 -> ejecuta todos
+#   python benchmarks.py escalado        -> solo el indicado (escalado, ids, jerarquia, vectorizado, diferencial)
+
+
+def benchmark_escalado_paralelo(num_aeropuertos=1500, num_consultas=2000, num_origenes=120):
+    codigos = generar_codigos(num_aeropuertos)
+    grafo = construir_grafo(generar_tarifas(num_aeropuertos, semilla=1), set(codigos))
+
+    rng = random.Random(2)
+    origenes = rng.sample(codigos, min(num_origenes, len(codigos)))
+    consultas = [(rng.choice(origenes), rng.choice(codigos)) for _ in range(num_consultas)]
+
+    print(f"Escalado paralelo: {num_aeropuertos} aeropuertos, {num_consultas} consultas, {len(origenes)} orígenes")
+    procesos_disponibles = os.cpu_count() or 1
+    niveles = [p for p in (1, 2, 4, 8, 16, 32) if p <= procesos_disponibles]
+    if niveles[-1] != procesos_disponibles:
+        niveles.append(procesos_disponibles)
+
+    referencia = None
+    tiempo_base = None
+    for procesos in niveles:
+        inicio = time.perf_counter()
+        resultados = resolver_lote(grafo, consultas, procesos=procesos)
+        transcurrido = time.perf_counter() - inicio
+
+        if referencia is None:
+            referencia = resultados
+            tiempo_base = transcurrido
+        elif resultados != referencia:
+            raise AssertionError(f"Los resultados con {procesos} procesos difieren de la ejecución secuencial")
+
+        print(f"  {procesos:>2} procesos: {transcurrido:8.3f} s  (aceleración x{tiempo_base / transcurrido:.2f})")
+
+    # El caso más común en la práctica: cada consulta con un origen distinto (sin árboles
+    # que reutilizar), frente a la búsqueda de referencia consulta por consulta
+    distintas = [(origen, rng.choice(codigos)) for origen in rng.sample(codigos, min(200, len(codigos)))]
+    inicio = time.perf_counter()
+    resultados = resolver_lote(grafo, distintas, procesos=1)
+    tiempo_lote = time.perf_counter() - inicio
+    muestra = distintas[:20]
+    inicio = time.perf_counter()
+    referencia = [encontrar_ruta_mas_barata(grafo, origen, destino) for origen, destino in muestra]
+    tiempo_referencia = (time.perf_counter() - inicio) * len(distintas) / len(muestra)
+    if resultados[:len(muestra)] != referencia:
+        raise AssertionError("El lote con orígenes distintos no coincide con encontrar_ruta_mas_barata")
+    print(f"  {len(distintas)} consultas con orígenes distintos (1 proceso): {tiempo_lote:8.3f} s  "
+          f"(referencia estimada {tiempo_referencia:.3f} s)")
+
+
+def _ruta_mas_barata_heap_codigos(grafo, origen, destino):
+    # Línea base del benchmark de ids: el mismo algoritmo que encontrar_ruta_mas_barata_ids
+    # (heap, distancias y predecesores) pero con códigos como claves, para medir solo el
+    # efecto de usar ids enteros y no el de cambiar la cola de prioridad
+    distancias = {nodo: (float('inf'), float('inf')) for nodo in grafo}
+    distancias[origen] = (0, 0)
+    predecesores = {origen: None}
+    cola_prioridad = [(0, 0, origen)]
+
+    while cola_prioridad:
+        costo_actual, escalas_actuales, nodo_actual = heapq.heappop(cola_prioridad)
+        if (costo_actual, escalas_actuales) > distancias[nodo_actual]:
+            continue
+        if nodo_actual == destino:
+            ruta = [destino]
+            while predecesores[ruta[-1]] is not None:
+                ruta.append(predecesores[ruta[-1]])
+            ruta.reverse()
+            return costo_actual, escalas_actuales, ruta
+
+        nuevas_escalas = escalas_actuales + 1
+        for vecino, precio_vuelo in grafo.get(nodo_actual, []):
+            nuevo_costo = costo_actual + precio_vuelo
+            if (nuevo_costo, nuevas_escalas) < distancias[vecino]:
+                distancias[vecino] = (nuevo_costo, nuevas_escalas)
+                predecesores[vecino] = nodo_actual
+                heapq.heappush(cola_prioridad, (nuevo_costo, nuevas_escalas, vecino))
+
+    return float('inf'), 0, []
+
+
+def benchmark_ids_enteros(num_aeropuertos=1500, num_consultas=600, num_consultas_referencia=60):
+    codigos = generar_codigos(num_aeropuertos)
+    grafo = construir_grafo(generar_tarifas(num_aeropuertos, semilla=1), set(codigos))
+    registro = RegistroAeropuertos(codigos)
+    adyacencia = registro.a_ids(grafo)
+
+    rng = random.Random(3)
+    consultas = [(rng.choice(codigos), rng.choice(codigos)) for _ in range(num_consultas)]
+    print(f"Búsqueda por códigos vs ids (ambas con heap): {num_aeropuertos} aeropuertos, {num_consultas} consultas")
+
+    inicio = time.perf_counter()
+    por_codigos = [_ruta_mas_barata_heap_codigos(grafo, origen, destino) for origen, destino in consultas]
+    tiempo_codigos = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    por_ids = []
+    for origen, destino in consultas:
+        costo, escalas, ruta = encontrar_ruta_mas_barata_ids(adyacencia, registro.id(origen), registro.id(destino))
+        por_ids.append((costo, escalas, registro.a_codigos(ruta)))
+    tiempo_ids = time.perf_counter() - inicio
+
+    # Paridad con la búsqueda de referencia (lista ordenada) sobre una muestra: es lenta
+    muestra = consultas[:num_consultas_referencia]
+    inicio = time.perf_counter()
+    referencia = [encontrar_ruta_mas_barata(grafo, origen, destino) for origen, destino in muestra]
+    tiempo_referencia = (time.perf_counter() - inicio) * len(consultas) / max(1, len(muestra))
+
+    if por_codigos[:len(muestra)] != referencia or por_ids[:len(muestra)] != referencia:
+        raise AssertionError("Las búsquedas con heap no coinciden con encontrar_ruta_mas_barata")
+    if por_ids != por_codigos:
+        raise AssertionError("La búsqueda por ids no coincide con la búsqueda por códigos")
+    print(f"  referencia (lista ordenada, estimado): {tiempo_referencia:8.3f} s")
+    print(f"  heap con códigos:                      {tiempo_codigos:8.3f} s  "
+          f"(aceleración por el heap x{tiempo_referencia / tiempo_codigos:.2f})")
+    print(f"  heap con ids:                          {tiempo_ids:8.3f} s  "
+          f"(aceleración por los ids x{tiempo_codigos / tiempo_ids:.2f})")
+
+
+def benchmark_jerarquia(num_aeropuertos=1500, num_consultas=600, repeticiones=3):
+    # Mismo camino que main._buscar_ruta: DatosIndexados elige la jerarquía del perfil
+    # cuando está lista y, si no, Dijkstra sobre ids
+    codigos = generar_codigos(num_aeropuertos)
+    datos = DatosIndexados(generar_visas(codigos, proporcion_con_visa=0.0), generar_tarifas(num_aeropuertos, semilla=1))
+    perfil = datos.perfil(tiene_visa=False)
+    grafo = datos.grafo(perfil)
+    registro = datos.registro
+    adyacencia = datos.adyacencia(perfil)
+
+    rng = random.Random(4)
+    consultas = [(rng.choice(codigos), rng.choice(codigos)) for _ in range(num_consultas)]
+    print(f"Jerarquía de contracción vs búsqueda por ids: {num_aeropuertos} aeropuertos, {num_consultas} consultas")
+
+    inicio = time.perf_counter()
+    jerarquia = datos.jerarquia(perfil, esperar=True)
+    tiempo_construccion = time.perf_counter() - inicio
+    aristas = sum(len(destinos) for destinos in grafo.values()) // 2
+    atajos = len(jerarquia.medio) // 2
+
+    # Se toma el mejor de varias repeticiones: las consultas son cortas y el ruido alto
+    tiempo_jerarquia = tiempo_ids = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        por_jerarquia = [jerarquia.encontrar_ruta_mas_barata(origen, destino) for origen, destino in consultas]
+        tiempo_jerarquia = min(tiempo_jerarquia, time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        por_ids = []
+        for origen, destino in consultas:
+            costo, escalas, ruta = encontrar_ruta_mas_barata_ids(adyacencia, registro.id(origen), registro.id(destino))
+            por_ids.append((costo, escalas, registro.a_codigos(ruta)))
+        tiempo_ids = min(tiempo_ids, time.perf_counter() - inicio)
+
+    # Con empates de (costo, vuelos) las rutas pueden diferir: se compara el peso
+    if [resultado[:2] for resultado in por_jerarquia] != [resultado[:2] for resultado in por_ids]:
+        raise AssertionError("La jerarquía de contracción no coincide con encontrar_ruta_mas_barata_ids")
+    print(f"  preprocesamiento: {tiempo_construccion:8.3f} s  ({atajos} atajos sobre {aristas} aristas)")
+    print(f"  búsqueda por ids: {tiempo_ids / num_consultas * 1000:8.3f} ms por consulta")
+    print(f"  jerarquía:        {tiempo_jerarquia / num_consultas * 1000:8.3f} ms por consulta  "
+          f"(aceleración x{tiempo_ids / tiempo_jerarquia:.2f}, amortiza el preprocesamiento "
+          f"tras ~{tiempo_construccion / max(1e-9, (tiempo_ids - tiempo_jerarquia) / num_consultas):.0f} consultas)")
+
+
+def benchmark_vectorizado(num_aeropuertos=1500, num_consultas=2000, num_origenes=120):
+    if not vectorized_backend.DISPONIBLE:
+        print("Backend vectorizado: NumPy/SciPy no están instalados, se omite")
+        return
+
+    codigos = generar_codigos(num_aeropuertos)
+    grafo = construir_grafo(generar_tarifas(num_aeropuertos, semilla=1), set(codigos))
+    rng = random.Random(2)
+    origenes = rng.sample(codigos, min(num_origenes, len(codigos)))
+    consultas = [(rng.choice(origenes), rng.choice(codigos)) for _ in range(num_consultas)]
+    print(f"Backend vectorizado: {num_aeropuertos} aeropuertos, {num_consultas} consultas, {len(origenes)} orígenes")
+
+    inicio = time.perf_counter()
+    en_python = resolver_lote(grafo, consultas, procesos=1)
+    tiempo_python = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    vectorizado = vectorized_backend.resolver_lote(grafo, consultas)
+    tiempo_vectorizado = time.perf_counter() - inicio
+
+    if vectorizado != en_python:
+        raise AssertionError("El backend vectorizado no coincide con los motores en Python")
+    print(f"  Python:      {tiempo_python:8.3f} s")
+    print(f"  vectorizado: {tiempo_vectorizado:8.3f} s  (aceleración x{tiempo_python / tiempo_vectorizado:.2f})")
+
+
+BENCHMARKS = {
+    'escalado': benchmark_escalado_paralelo,
+    'ids': benchmark_ids_enteros,
+    'jerarquia': benchmark_jerarquia,
+    'vectorizado': benchmark_vectorizado,
+    'diferencial': benchmark_diferencial,
+}
+
+
+if __name__ == "__main__":
+    seleccion = sys.argv[1:] or list(BENCHMARKS)
+    for nombre in seleccion:
+        BENCHMARKS[nombre]()
@@ -1,3 +1,8 @@
+from cancellation import CancellationToken
+from graph_index import IndiceGrafo
+from tracing import trazado
+
+
 class BFSPathfinder:
     
     def __init__(self, grafo: dict[str, list[tuple[str, float]]]):
@@ -6,13 +11,19 @@ class BFSPathfinder:
         self.padres: dict[str, str | None] = {}
         self.costos: dict[str, float] = {}
     
-    def encontrar_ruta_menos_escalas(self, origen: str, destino: str) -> tuple[float, int, list[str]]:
+    def encontrar_ruta_menos_escalas(self, origen: str, destino: str,
+                                     cancelacion: CancellationToken | None = None,
+                                     indice: IndiceGrafo | None = None) -> tuple[float, int, list[str]]:
         # Verificar que origen y destino existen en el grafo
         if origen not in self.grafo:
             return float('inf'), 0, []
         if destino not in self.grafo:
             return float('inf'), 0, []
         
+        # Con el índice de componentes, una consulta sin ruta posible se descarta en O(1)
+        if indice is not None and not indice.conectados(origen, destino):
+            return float('inf'), 0, []
+        
         # Inicializar estructuras de datos
         self.visitados.clear()
         self.padres.clear()
@@ -32,6 +43,10 @@ class BFSPathfinder:
         
         # Algoritmo BFS principal
         while cola and not destino_encontrado:
+            # Permitir que la búsqueda se cancele desde otro hilo
+            if cancelacion is not None:
+                cancelacion.verificar()
+            
             # Extraer el primer elemento de la cola (FIFO)
             # Nota: pop(0) es O(n), menos eficiente que deque.popleft() que es O(1)
             nodo_actual, costo_actual = cola.pop(0)
@@ -121,8 +136,11 @@ class BFSPathfinder:
         }
 
 
+@trazado()
 def encontrar_ruta_menos_escalas_bfs(grafo: dict[str, list[tuple[str, float]]], 
                                     origen: str, 
-                                    destino: str) -> tuple[float, int, list[str]]:
+                                    destino: str,
+                                    cancelacion: CancellationToken | None = None,
+                                    indice: IndiceGrafo | None = None) -> tuple[float, int, list[str]]:
     bfs_finder = BFSPathfinder(grafo)
-    return bfs_finder.encontrar_ruta_menos_escalas(origen, destino) 
\ No newline at end of file
+    return bfs_finder.encontrar_ruta_menos_escalas(origen, destino, cancelacion, indice) 
\ No newline at end of file
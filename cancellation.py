@@ -0,0 +1,26 @@
+import threading
+
+
+class SearchCancelled(Exception):
+    """Se lanza dentro de una búsqueda cuando su token de cancelación fue activado."""
+
+
+class CancellationToken:
+    """
+    Token compartido entre quien lanza una búsqueda y la búsqueda misma.
+    Los bucles de búsqueda llaman a verificar() en cada iteración.
+    """
+
+    def __init__(self):
+        self._evento = threading.Event()
+
+    def cancelar(self) -> None:
+        self._evento.set()
+
+    @property
+    def cancelado(self) -> bool:
+        return self._evento.is_set()
+
+    def verificar(self) -> None:
+        if self._evento.is_set():
+            raise SearchCancelled()
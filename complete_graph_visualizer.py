@@ -2,9 +2,70 @@ import tkinter as tk
 from tkinter import Canvas, Scrollbar, Frame
 import math
 import json
+from force_layout import calcular_layout, escalar_posiciones
+from graph_index import IndiceGrafo, firma_archivo
+from svg_canvas import SVGCanvas
+from tracing import trazado
 
 class CompleteGraphVisualizer:
-    def __init__(self, parent):
+    # Niveles de detalle según el factor de zoom
+    ZOOM_MIN = 0.05
+    ZOOM_MAX = 4.0
+    UMBRAL_PRECIOS = 0.8          # Por debajo no se dibujan las etiquetas de precio
+    UMBRAL_ETIQUETAS = 0.4        # Por debajo los nodos se dibujan sin texto
+    UMBRAL_AGRUPACION = 0.5       # Por debajo las aristas se agrupan por celdas...
+    MIN_ARISTAS_AGRUPACION = 500  # ...si la red tiene al menos estas aristas
+    TAM_CELDA_INDICE = 200        # Celda del índice espacial (coordenadas del grafo)
+    MAX_CELDAS_ARISTA = 16        # Aristas que cruzan más celdas se indexan por su rectángulo
+    TAM_CELDA_AGRUPACION = 40     # Celda de agrupación de aristas (píxeles en pantalla)
+    MARGEN_VISTA = 100            # Píxeles alrededor de la vista que también se dibujan
+    MARGEN_MUNDO = 80             # Margen alrededor de los nodos en el área de scroll
+    UMBRAL_LAYOUT_FUERZAS = 40    # Con más nodos se usa el layout dirigido por fuerzas
+    SEPARACION_NODOS = 90         # Separación media buscada entre nodos en ese layout (píxeles)
+    
+    # Red completa ya cargada e indexada: (firma de tarifas.json, tarifas, grafo, índice).
+    # Se comparte entre ventanas mientras el archivo no cambie.
+    _red_cargada = None
+    
+    def __init__(self, parent, lienzo=None):
+        # Estado del dibujado incremental
+        self.zoom = 1.0
+        self._zoom_dibujado = None
+        self._redibujado_pendiente = None
+        self._items_aristas = {}  # {indice_arista: [ids del canvas]}
+        self._items_nodos = {}    # {nodo: [ids del canvas]}
+        
+        if lienzo is not None:
+            # Dibujado sin ventana (exportación, por ejemplo con SVGCanvas)
+            self.window = None
+            self.canvas = lienzo
+            self.stats_label = None
+        else:
+            self._crear_ventana(parent)
+        
+        # Cargar todas las tarifas directamente (o reutilizar la carga anterior)
+        self.tarifas, self.grafo_completo, self.indice = self._cargar_red_completa()
+        self.posiciones = {}
+        
+        # Calcular y mostrar estadísticas
+        self._calcular_estadisticas()
+        
+        # Calcular posiciones e índices espaciales
+        self._calcular_posiciones()
+        self._preparar_indices()
+        
+        if lienzo is not None:
+            # Al exportar, el área de scroll es el área del documento: todo el grafo a zoom 1
+            self.zoom = 1.0
+            self._actualizar_region_scroll()
+        else:
+            self._ajustar_zoom_inicial()
+        
+        # Dibujar solo la parte visible
+        self._dibujar_grafo_completo()
+    
+    def _crear_ventana(self, parent):
+        """Crea la ventana con el canvas, las scrollbars y el panel de estadísticas"""
         self.window = tk.Toplevel(parent)
         self.window.title("Vista Completa de Todas las Rutas")
         self.window.geometry("1200x800")  # Ventana más grande
@@ -26,9 +87,12 @@ class CompleteGraphVisualizer:
         h_scrollbar = Scrollbar(canvas_frame, orient="horizontal")
         
         # Canvas
+        # Los comandos de scroll pasan por el visualizador para redibujar solo lo visible
         self.canvas = Canvas(canvas_frame, width=1100, height=650, bg="white",  # Canvas más grande
-                           yscrollcommand=v_scrollbar.set,
-                           xscrollcommand=h_scrollbar.set)
+                           yscrollcommand=self._al_desplazar_y,
+                           xscrollcommand=self._al_desplazar_x)
+        self.v_scrollbar = v_scrollbar
+        self.h_scrollbar = h_scrollbar
         
         v_scrollbar.config(command=self.canvas.yview)
         h_scrollbar.config(command=self.canvas.xview)
@@ -37,10 +101,11 @@ class CompleteGraphVisualizer:
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        # Cargar todas las tarifas directamente
-        self.tarifas = self._cargar_tarifas_completas()
-        self.grafo_completo = self._construir_grafo_completo()
-        self.posiciones = {}
+        # Zoom con la rueda del ratón (Windows/macOS usan <MouseWheel>, Linux Button-4/5)
+        self.canvas.bind("<MouseWheel>", self._al_rueda)
+        self.canvas.bind("<Button-4>", self._al_rueda)
+        self.canvas.bind("<Button-5>", self._al_rueda)
+        self.canvas.bind("<Configure>", lambda event: self._programar_redibujado())
         
         # Estadísticas
         self.stats_label = tk.Label(info_frame, text="", justify=tk.LEFT, 
@@ -49,16 +114,20 @@ class CompleteGraphVisualizer:
         
         # Botón para cerrar
         tk.Button(info_frame, text="Cerrar", command=self.window.destroy).pack(side=tk.RIGHT, padx=10)
+    
+    @trazado()
+    def _cargar_red_completa(self):
+        """Devuelve (tarifas, grafo, índice), cargándolos solo si tarifas.json cambió"""
+        firma = firma_archivo("tarifas.json")
+        red = CompleteGraphVisualizer._red_cargada
+        if red is not None and firma is not None and red[0] == firma:
+            return red[1:]
         
-        # Calcular y mostrar estadísticas
-        self._calcular_estadisticas()
-        
-        # Dibujar el grafo
-        self._calcular_posiciones()
-        self._dibujar_grafo_completo()
-        
-        # Configurar área de scroll
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
+        self.tarifas = self._cargar_tarifas_completas()
+        grafo = self._construir_grafo_completo()
+        red = (firma, self.tarifas, grafo, IndiceGrafo(grafo))
+        CompleteGraphVisualizer._red_cargada = red
+        return red[1:]
     
     def _cargar_tarifas_completas(self):
         """Carga directamente el archivo tarifas.json"""
@@ -96,32 +165,31 @@ class CompleteGraphVisualizer:
         return grafo
     
     def _calcular_estadisticas(self):
-        """Calcula y muestra estadísticas del grafo"""
+        """Muestra estadísticas del grafo (precalculadas en el índice al cargar)"""
         num_aeropuertos = len(self.grafo_completo)
         num_rutas = len(self.tarifas)
         
-        # Calcular conexiones por aeropuerto
-        conexiones_por_aeropuerto = {}
-        for aeropuerto, conexiones in self.grafo_completo.items():
-            # Dividir por 2 porque cada ruta se cuenta dos veces (ida y vuelta)
-            conexiones_directas = len(set(destino for destino, _ in conexiones))
-            conexiones_por_aeropuerto[aeropuerto] = conexiones_directas
+        # Conexiones directas (destinos distintos) por aeropuerto
+        conexiones_por_aeropuerto = self.indice.grados
         
-        # Aeropuerto con más conexiones
-        max_conexiones = max(conexiones_por_aeropuerto.items(), key=lambda x: x[1])
-        min_conexiones = min(conexiones_por_aeropuerto.items(), key=lambda x: x[1])
+        # Aeropuerto con más y con menos conexiones
+        max_conexiones = self.indice.mas_conectado()
+        min_conexiones = self.indice.menos_conectado()
         
         stats_text = f"""Estadísticas del Grafo Completo:
 • Total de aeropuertos: {num_aeropuertos}
 • Total de rutas directas: {num_rutas}
 • Aeropuerto con más conexiones: {max_conexiones[0]} ({max_conexiones[1]} conexiones)
-• Aeropuerto con menos conexiones: {min_conexiones[0]} ({min_conexiones[1]} conexiones)"""
+• Aeropuerto con menos conexiones: {min_conexiones[0]} ({min_conexiones[1]} conexiones)
+• Grupos de aeropuertos conectados entre sí: {self.indice.num_componentes}"""
         
-        self.stats_label.config(text=stats_text)
+        if self.stats_label is not None:
+            self.stats_label.config(text=stats_text)
         
         # Guardar para mostrar en los nodos
         self.conexiones_por_aeropuerto = conexiones_por_aeropuerto
     
+    @trazado()
     def _calcular_posiciones(self):
         """Calcula las posiciones usando un layout mejorado"""
         nodos = list(self.grafo_completo.keys())
@@ -130,6 +198,13 @@ class CompleteGraphVisualizer:
         if num_nodos == 0:
             return
         
+        # Con muchos nodos los anillos se superponen: layout dirigido por fuerzas en un
+        # área que crece con la red (las posiciones quedan en caché por versión del grafo)
+        if num_nodos > self.UMBRAL_LAYOUT_FUERZAS:
+            lado = max(1100, math.sqrt(num_nodos) * self.SEPARACION_NODOS)
+            self.posiciones = escalar_posiciones(calcular_layout(self.grafo_completo), 0, 0, lado, lado)
+            return
+        
         # Ordenar nodos por número de conexiones (los más conectados en el centro)
         nodos_ordenados = sorted(nodos, 
                                 key=lambda x: self.conexiones_por_aeropuerto[x], 
@@ -156,96 +231,307 @@ class CompleteGraphVisualizer:
                 y = centro_y + radio * math.sin(angulo)
                 self.posiciones[nodo] = (x, y)
     
-    def _dibujar_grafo_completo(self):
-        """Dibuja el grafo completo con todas las rutas"""
-        # Primero dibujar todas las aristas
-        self._dibujar_todas_las_aristas()
-        
-        # Luego dibujar los nodos con información adicional
-        self._dibujar_nodos_con_info()
-        
-        # Leyenda
-        self._dibujar_leyenda()
-    
-    def _dibujar_todas_las_aristas(self):
-        """Dibuja TODAS las conexiones del archivo"""
-        conexiones_dibujadas = set()
-        
+    @trazado()
+    def _preparar_indices(self):
+        """Prepara la lista de aristas únicas y los índices espaciales de aristas y nodos"""
+        # Una arista por par de aeropuertos (la primera tarifa del archivo, como antes)
+        self.aristas = []
+        conexiones_vistas = set()
         for tarifa in self.tarifas:
             origen = tarifa['origen']
             destino = tarifa['destino']
-            precio = tarifa['precio']
-            
             if origen not in self.posiciones or destino not in self.posiciones:
                 continue
-            
-            # Crear identificador único para la conexión
             conexion_id = tuple(sorted([origen, destino]))
-            if conexion_id not in conexiones_dibujadas:
-                conexiones_dibujadas.add(conexion_id)
-                
-                x1, y1 = self.posiciones[origen]
-                x2, y2 = self.posiciones[destino]
-                
-                # Color según el precio
-                if precio < 50:
-                    color = "green"
-                    width = 2
-                elif precio < 100:
-                    color = "orange"
-                    width = 1.5
-                else:
-                    color = "red"
-                    width = 1
-                
-                # Dibujar línea
-                self.canvas.create_line(x1, y1, x2, y2, 
-                                       fill=color, width=width, 
-                                       tags="arista")
-                
-                # Precio en el medio
-                mid_x = (x1 + x2) / 2
-                mid_y = (y1 + y2) / 2
-                
-                # Calcular un desplazamiento perpendicular a la línea para evitar superposición
-                dx = x2 - x1
-                dy = y2 - y1
-                length = math.sqrt(dx*dx + dy*dy)
-                if length > 0:
-                    # Vector perpendicular normalizado
-                    perp_x = -dy / length * 15  # 15 píxeles de desplazamiento
-                    perp_y = dx / length * 15
-                else:
-                    perp_x, perp_y = 0, -15
-                
-                # Crear un rectángulo blanco de fondo para el texto
-                text_id = self.canvas.create_text(mid_x + perp_x, mid_y + perp_y,
-                                      text=f"${precio}", 
-                                      font=("Arial", 8, "bold"),
-                                      fill="black",
-                                      tags="precio")
-                
-                # Obtener los límites del texto
-                bbox = self.canvas.bbox(text_id)
-                if bbox:
-                    # Crear rectángulo blanco detrás del texto
-                    rect_id = self.canvas.create_rectangle(
-                        bbox[0]-2, bbox[1]-1, bbox[2]+2, bbox[3]+1,
-                        fill="white", outline="white", tags="precio_bg"
-                    )
-                    # Mover el rectángulo detrás del texto
-                    self.canvas.tag_lower(rect_id, text_id)
-    
-    def _dibujar_nodos_con_info(self):
-        """Dibuja los nodos con información de conexiones"""
+            if conexion_id not in conexiones_vistas:
+                conexiones_vistas.add(conexion_id)
+                self.aristas.append((origen, destino, tarifa['precio']))
+
+        # Rejilla de nodos: {(celda_x, celda_y): [nodos]}
+        self._rejilla_nodos = {}
         for nodo, (x, y) in self.posiciones.items():
+            self._rejilla_nodos.setdefault(self._celda(x, y), []).append(nodo)
+
+        # Rejilla de aristas: cada arista se registra en las celdas que atraviesa.
+        # Las muy largas cruzarían demasiadas celdas: se guardan aparte con su rectángulo
+        self._rejilla_aristas = {}
+        self._aristas_largas = []
+        paso = self.TAM_CELDA_INDICE / 2
+        for indice, (origen, destino, _) in enumerate(self.aristas):
+            x1, y1 = self.posiciones[origen]
+            x2, y2 = self.posiciones[destino]
+            pasos = max(1, int(math.hypot(x2 - x1, y2 - y1) / paso))
+            if pasos > self.MAX_CELDAS_ARISTA:
+                self._aristas_largas.append((indice, min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)))
+                continue
+            celdas = {self._celda(x1 + (x2 - x1) * k / pasos, y1 + (y2 - y1) * k / pasos)
+                      for k in range(pasos + 1)}
+            for celda in celdas:
+                self._rejilla_aristas.setdefault(celda, []).append(indice)
+
+        # Límites del grafo en sus propias coordenadas
+        if self.posiciones:
+            xs = [x for x, _ in self.posiciones.values()]
+            ys = [y for _, y in self.posiciones.values()]
+            self.limites = (min(xs) - self.MARGEN_MUNDO, min(ys) - self.MARGEN_MUNDO,
+                            max(xs) + self.MARGEN_MUNDO, max(ys) + self.MARGEN_MUNDO)
+        else:
+            self.limites = (0, 0, 1100, 650)
+
+    def _celda(self, x, y):
+        return int(x // self.TAM_CELDA_INDICE), int(y // self.TAM_CELDA_INDICE)
+
+    def _tamano_canvas(self):
+        ancho = self.canvas.winfo_width()
+        alto = self.canvas.winfo_height()
+        # Antes de mostrarse la ventana Tk informa 1x1: usamos el tamaño configurado
+        if ancho <= 1 or alto <= 1:
+            ancho = int(self.canvas.cget("width"))
+            alto = int(self.canvas.cget("height"))
+        return ancho, alto
+
+    def _ajustar_zoom_inicial(self):
+        """Si la red no cabe en pantalla, empieza con un zoom que la muestre completa"""
+        ancho, alto = self._tamano_canvas()
+        x0, y0, x1, y1 = self.limites
+        zoom = min(1.0, ancho / (x1 - x0), alto / (y1 - y0))
+        self.zoom = max(self.ZOOM_MIN, zoom)
+        self._actualizar_region_scroll()
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+
+    def _actualizar_region_scroll(self):
+        x0, y0, x1, y1 = self.limites
+        self.region = (x0 * self.zoom, y0 * self.zoom, x1 * self.zoom, y1 * self.zoom)
+        self.canvas.config(scrollregion=self.region)
+
+    def _vista_actual(self):
+        """Rectángulo visible (más un margen) en coordenadas del grafo"""
+        ancho, alto = self._tamano_canvas()
+        margen = self.MARGEN_VISTA
+        x0 = (self.canvas.canvasx(0) - margen) / self.zoom
+        y0 = (self.canvas.canvasy(0) - margen) / self.zoom
+        x1 = (self.canvas.canvasx(ancho) + margen) / self.zoom
+        y1 = (self.canvas.canvasy(alto) + margen) / self.zoom
+        return x0, y0, x1, y1
+
+    def _consultar_rejilla(self, rejilla, vista):
+        cx0, cy0 = self._celda(vista[0], vista[1])
+        cx1, cy1 = self._celda(vista[2], vista[3])
+        encontrados = set()
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                encontrados.update(rejilla.get((cx, cy), ()))
+        return encontrados
+
+    def _al_desplazar_x(self, *args):
+        self.h_scrollbar.set(*args)
+        self._programar_redibujado()
+
+    def _al_desplazar_y(self, *args):
+        self.v_scrollbar.set(*args)
+        self._programar_redibujado()
+
+    def _al_rueda(self, event):
+        """Zoom centrado en la posición del puntero"""
+        if event.num == 5 or event.delta < 0:
+            factor = 1 / 1.2
+        else:
+            factor = 1.2
+
+        nuevo_zoom = min(self.ZOOM_MAX, max(self.ZOOM_MIN, self.zoom * factor))
+        if nuevo_zoom == self.zoom:
+            return
+
+        # Punto del grafo bajo el puntero antes del zoom
+        grafo_x = self.canvas.canvasx(event.x) / self.zoom
+        grafo_y = self.canvas.canvasy(event.y) / self.zoom
+
+        self.zoom = nuevo_zoom
+        self._actualizar_region_scroll()
+
+        # Desplazar la vista para que ese punto quede otra vez bajo el puntero
+        rx0, ry0, rx1, ry1 = self.region
+        self.canvas.xview_moveto((grafo_x * self.zoom - event.x - rx0) / (rx1 - rx0))
+        self.canvas.yview_moveto((grafo_y * self.zoom - event.y - ry0) / (ry1 - ry0))
+        self._programar_redibujado()
+
+    def _programar_redibujado(self):
+        # Agrupa varios eventos seguidos (scroll, zoom, redimensionado) en un solo redibujado
+        if self._redibujado_pendiente is None:
+            self._redibujado_pendiente = self.canvas.after(30, self._dibujar_grafo_completo)
+
+    def _agrupar_aristas(self):
+        return self.zoom < self.UMBRAL_AGRUPACION and len(self.aristas) >= self.MIN_ARISTAS_AGRUPACION
+
+    @trazado()
+    def _dibujar_grafo_completo(self):
+        """Dibuja la parte visible del grafo según el nivel de detalle actual"""
+        self._redibujado_pendiente = None
+        vista = self._vista_actual()
+
+        # Con otro zoom cambian todas las coordenadas: se empieza desde cero
+        if self._zoom_dibujado != self.zoom:
+            self.canvas.delete("grafo")
+            self._items_aristas.clear()
+            self._items_nodos.clear()
+            self._zoom_dibujado = self.zoom
+
+        # Primero dibujar las aristas visibles
+        aristas_visibles = self._consultar_rejilla(self._rejilla_aristas, vista)
+        aristas_visibles.update(indice for indice, x0, y0, x1, y1 in self._aristas_largas
+                                if x0 <= vista[2] and x1 >= vista[0] and y0 <= vista[3] and y1 >= vista[1])
+        if self._agrupar_aristas():
+            self.canvas.delete("grupo")
+            self._dibujar_aristas_agrupadas(aristas_visibles)
+        else:
+            self._dibujar_todas_las_aristas(aristas_visibles)
+
+        # Luego dibujar los nodos con información adicional
+        self._dibujar_nodos_con_info(self._consultar_rejilla(self._rejilla_nodos, vista))
+
+        # Los nodos siempre encima de las aristas recién creadas
+        self.canvas.tag_raise("capa_nodos")
+
+        # Leyenda
+        self._dibujar_leyenda()
+
+    def _dibujar_todas_las_aristas(self, visibles=None):
+        """Dibuja las conexiones indicadas (todas por defecto), borrando las que dejaron de verse"""
+        if visibles is None:
+            visibles = set(range(len(self.aristas)))
+
+        # Borrar solo lo que salió de la vista
+        for indice in [i for i in self._items_aristas if i not in visibles]:
+            self.canvas.delete(*self._items_aristas.pop(indice))
+
+        mostrar_precios = self.zoom >= self.UMBRAL_PRECIOS
+        for indice in visibles:
+            if indice in self._items_aristas:
+                continue
+
+            origen, destino, precio = self.aristas[indice]
+            x1, y1 = self.posiciones[origen]
+            x2, y2 = self.posiciones[destino]
+            x1, y1, x2, y2 = x1 * self.zoom, y1 * self.zoom, x2 * self.zoom, y2 * self.zoom
+
+            color, width = self._estilo_precio(precio)
+
+            # Dibujar línea
+            items = [self.canvas.create_line(x1, y1, x2, y2,
+                                             fill=color, width=width,
+                                             tags=("arista", "grafo"))]
+
+            if mostrar_precios:
+                items.extend(self._dibujar_precio(x1, y1, x2, y2, precio))
+
+            self._items_aristas[indice] = items
+
+    def _estilo_precio(self, precio):
+        # Color según el precio
+        if precio < 50:
+            return "green", 2
+        elif precio < 100:
+            return "orange", 1.5
+        return "red", 1
+
+    def _dibujar_precio(self, x1, y1, x2, y2, precio):
+        # Precio en el medio
+        mid_x = (x1 + x2) / 2
+        mid_y = (y1 + y2) / 2
+
+        # Calcular un desplazamiento perpendicular a la línea para evitar superposición
+        dx = x2 - x1
+        dy = y2 - y1
+        length = math.sqrt(dx*dx + dy*dy)
+        if length > 0:
+            # Vector perpendicular normalizado
+            perp_x = -dy / length * 15  # 15 píxeles de desplazamiento
+            perp_y = dx / length * 15
+        else:
+            perp_x, perp_y = 0, -15
+
+        # Crear un rectángulo blanco de fondo para el texto
+        text_id = self.canvas.create_text(mid_x + perp_x, mid_y + perp_y,
+                              text=f"${precio}",
+                              font=("Arial", 8, "bold"),
+                              fill="black",
+                              tags=("precio", "grafo"))
+        items = [text_id]
+
+        # Obtener los límites del texto
+        bbox = self.canvas.bbox(text_id)
+        if bbox:
+            # Crear rectángulo blanco detrás del texto
+            rect_id = self.canvas.create_rectangle(
+                bbox[0]-2, bbox[1]-1, bbox[2]+2, bbox[3]+1,
+                fill="white", outline="white", tags=("precio_bg", "grafo")
+            )
+            # Mover el rectángulo detrás del texto
+            self.canvas.tag_lower(rect_id, text_id)
+            items.append(rect_id)
+        return items
+
+    def _dibujar_aristas_agrupadas(self, visibles):
+        """Con poco zoom, une en una sola línea las aristas que van entre las mismas celdas de pantalla"""
+        tam_celda = self.TAM_CELDA_AGRUPACION / self.zoom
+
+        # {(celda_a, celda_b): [cantidad, precio_minimo, suma_x_a, suma_y_a, suma_x_b, suma_y_b]}
+        grupos = {}
+        for indice in visibles:
+            origen, destino, precio = self.aristas[indice]
+            xa, ya = self.posiciones[origen]
+            xb, yb = self.posiciones[destino]
+            celda_a = (int(xa // tam_celda), int(ya // tam_celda))
+            celda_b = (int(xb // tam_celda), int(yb // tam_celda))
+            if celda_a == celda_b:
+                continue  # A este zoom la arista mide menos que una celda
+            if celda_b < celda_a:
+                celda_a, celda_b = celda_b, celda_a
+                xa, ya, xb, yb = xb, yb, xa, ya
+
+            grupo = grupos.get((celda_a, celda_b))
+            if grupo is None:
+                grupos[(celda_a, celda_b)] = [1, precio, xa, ya, xb, yb]
+            else:
+                grupo[0] += 1
+                grupo[1] = min(grupo[1], precio)
+                grupo[2] += xa
+                grupo[3] += ya
+                grupo[4] += xb
+                grupo[5] += yb
+
+        for cantidad, precio_minimo, sxa, sya, sxb, syb in grupos.values():
+            # Cada haz va entre los centros de sus extremos; el grosor crece con la cantidad
+            color, _ = self._estilo_precio(precio_minimo)
+            self.canvas.create_line(sxa / cantidad * self.zoom, sya / cantidad * self.zoom,
+                                   sxb / cantidad * self.zoom, syb / cantidad * self.zoom,
+                                   fill=color, width=1 + math.log2(cantidad),
+                                   tags=("grupo", "grafo"))
+
+    def _dibujar_nodos_con_info(self, visibles=None):
+        """Dibuja los nodos con información de conexiones"""
+        if visibles is None:
+            visibles = set(self.posiciones)
+
+        for nodo in [n for n in self._items_nodos if n not in visibles]:
+            self.canvas.delete(*self._items_nodos.pop(nodo))
+
+        mostrar_texto = self.zoom >= self.UMBRAL_ETIQUETAS
+        for nodo in visibles:
+            if nodo in self._items_nodos:
+                continue
+
+            x, y = self.posiciones[nodo]
+            x, y = x * self.zoom, y * self.zoom
             num_conexiones = self.conexiones_por_aeropuerto[nodo]
-            
+
             # Tamaño según número de conexiones
             radio_base = 25
             radio = radio_base + (num_conexiones * 2)
             radio = min(radio, 50)  # Límite máximo
-            
+            radio = max(3, radio * self.zoom)
+
             # Color según número de conexiones
             if num_conexiones >= 6:
                 color = "darkred"
@@ -259,55 +545,74 @@ class CompleteGraphVisualizer:
             else:
                 color = "lightgreen"
                 text_color = "black"
-            
+
             # Dibujar círculo
-            self.canvas.create_oval(x - radio, y - radio, 
-                                   x + radio, y + radio,
-                                   fill=color, outline="black", 
-                                   width=2, tags="nodo")
-            
-            # Nombre del aeropuerto
-            self.canvas.create_text(x, y - 5, text=nodo, 
-                                   font=("Arial", 11, "bold"),
-                                   fill=text_color, tags="etiqueta")
-            
-            # Número de conexiones
-            self.canvas.create_text(x, y + 10, 
-                                   text=f"({num_conexiones})", 
-                                   font=("Arial", 9),
-                                   fill=text_color, tags="conexiones")
-    
+            items = [self.canvas.create_oval(x - radio, y - radio,
+                                             x + radio, y + radio,
+                                             fill=color, outline="black",
+                                             width=2 if mostrar_texto else 1,
+                                             tags=("nodo", "capa_nodos", "grafo"))]
+
+            if mostrar_texto:
+                # Nombre del aeropuerto
+                items.append(self.canvas.create_text(x, y - 5, text=nodo,
+                                                     font=("Arial", 11, "bold"),
+                                                     fill=text_color, tags=("etiqueta", "capa_nodos", "grafo")))
+
+                # Número de conexiones
+                items.append(self.canvas.create_text(x, y + 10,
+                                                     text=f"({num_conexiones})",
+                                                     font=("Arial", 9),
+                                                     fill=text_color, tags=("conexiones", "capa_nodos", "grafo")))
+
+            self._items_nodos[nodo] = items
+
     def _dibujar_leyenda(self):
-        """Dibuja una leyenda explicativa"""
-        x_leyenda = 20
-        y_leyenda = 20
-        
-        self.canvas.create_text(x_leyenda, y_leyenda, 
-                               text="Leyenda:", 
+        """Dibuja una leyenda explicativa en la esquina superior izquierda de la vista"""
+        self.canvas.delete("leyenda")
+        x_leyenda = self.canvas.canvasx(0) + 20
+        y_leyenda = self.canvas.canvasy(0) + 20
+
+        self.canvas.create_text(x_leyenda, y_leyenda,
+                               text="Leyenda:",
                                font=("Arial", 12, "bold"),
-                               anchor="w")
-        
+                               anchor="w", tags="leyenda")
+
         # Colores de líneas
         y_leyenda += 25
         self.canvas.create_line(x_leyenda, y_leyenda, x_leyenda + 30, y_leyenda,
-                               fill="green", width=2)
-        self.canvas.create_text(x_leyenda + 35, y_leyenda, 
-                               text="< $50", anchor="w", font=("Arial", 9))
-        
+                               fill="green", width=2, tags="leyenda")
+        self.canvas.create_text(x_leyenda + 35, y_leyenda,
+                               text="< $50", anchor="w", font=("Arial", 9), tags="leyenda")
+
         y_leyenda += 20
         self.canvas.create_line(x_leyenda, y_leyenda, x_leyenda + 30, y_leyenda,
-                               fill="orange", width=1.5)
-        self.canvas.create_text(x_leyenda + 35, y_leyenda, 
-                               text="$50-$99", anchor="w", font=("Arial", 9))
-        
+                               fill="orange", width=1.5, tags="leyenda")
+        self.canvas.create_text(x_leyenda + 35, y_leyenda,
+                               text="$50-$99", anchor="w", font=("Arial", 9), tags="leyenda")
+
         y_leyenda += 20
         self.canvas.create_line(x_leyenda, y_leyenda, x_leyenda + 30, y_leyenda,
-                               fill="red", width=1)
-        self.canvas.create_text(x_leyenda + 35, y_leyenda, 
-                               text="≥ $100", anchor="w", font=("Arial", 9))
-        
+                               fill="red", width=1, tags="leyenda")
+        self.canvas.create_text(x_leyenda + 35, y_leyenda,
+                               text="≥ $100", anchor="w", font=("Arial", 9), tags="leyenda")
+
         # Tamaño de nodos
         y_leyenda += 30
-        self.canvas.create_text(x_leyenda, y_leyenda, 
-                               text="Tamaño = # conexiones", 
-                               anchor="w", font=("Arial", 9, "italic")) 
\ No newline at end of file
+        self.canvas.create_text(x_leyenda, y_leyenda,
+                               text="Tamaño = # conexiones",
+                               anchor="w", font=("Arial", 9, "italic"), tags="leyenda")
+
+        # Controles
+        y_leyenda += 20
+        self.canvas.create_text(x_leyenda, y_leyenda,
+                               text="Rueda del ratón = zoom",
+                               anchor="w", font=("Arial", 9, "italic"), tags="leyenda")
+
+
+def exportar_svg(archivo: str = None) -> str:
+    """Dibuja la red completa de tarifas.json sin abrir ninguna ventana y devuelve el SVG"""
+    visualizador = CompleteGraphVisualizer(None, lienzo=SVGCanvas())
+    if archivo:
+        visualizador.canvas.guardar(archivo)
+    return visualizador.canvas.a_svg()
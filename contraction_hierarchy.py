@@ -0,0 +1,351 @@
+import heapq
+import json
+import os
+
+from airport_registry import RegistroAeropuertos
+from pathfinder import firma_grafo
+from tracing import trazado
+
+INFINITO = float('inf')
+
+
+def es_exacta(grafo: dict[str, list[tuple[str, float]]]) -> bool:
+    """
+    True si la jerarquía puede dar exactamente el resultado de encontrar_ruta_mas_barata:
+    todos los precios enteros y no negativos. Con precios decimales la suma en float
+    depende del orden (los atajos suman por tramos y Dijkstra vuelo a vuelo) y el costo
+    o el desempate por vuelos pueden cambiar; en ese caso hay que usar Dijkstra.
+    """
+    return all(float(precio).is_integer() and precio >= 0
+               for destinos in grafo.values() for _, precio in destinos)
+
+
+class ContractionHierarchy:
+    """
+    Jerarquía de contracción sobre el grafo de tarifas de un perfil de visa.
+
+    El preprocesamiento contrae los aeropuertos de menor a mayor importancia y agrega
+    atajos (shortcuts) que preservan los costos mínimos. Las consultas hacen una búsqueda
+    bidireccional que solo sube en la jerarquía, por lo que visitan muy pocos nodos.
+
+    Se trabaja sobre ids enteros (RegistroAeropuertos) y cada vuelo pesa
+    `precio * multiplicador + 1`, con el multiplicador mayor que el máximo de vuelos
+    posible: un solo entero ordena por costo y, a igual costo, por vuelos, y las sumas
+    son exactas en cualquier orden. Por eso solo se construye con precios enteros (ver
+    es_exacta); con decimales se usa Dijkstra.
+
+    En generar_tarifas(1500) (rutas de largo alcance que dejan un núcleo denso) el
+    preprocesamiento tarda ~15 s y las consultas son ~2.5 veces más rápidas que
+    encontrar_ruta_mas_barata_ids; `python benchmarks.py jerarquia` lo mide. Por eso
+    DatosIndexados.jerarquia la construye en segundo plano y solo en redes grandes.
+    """
+
+    # Límite de nodos asentados en cada búsqueda de testigos durante la contracción.
+    # Si se alcanza, se agrega el atajo (es seguro: solo cuesta algo más de memoria).
+    LIMITE_TESTIGOS = 150
+    # Peso de los atajos en la prioridad: más alto contrae antes los nodos que agregan
+    # pocos atajos y limita el crecimiento del grafo en la parte alta de la jerarquía
+    PESO_ATAJOS = 2
+
+    def __init__(self):
+        self.firma: str | None = None
+        self.registro = RegistroAeropuertos(())
+        self.multiplicador = 1
+        self.rango: list[int] = []
+        # Aristas hacia nodos de mayor rango: arriba[id] = [(id_vecino, peso), ...]
+        self.arriba: list[list[tuple[int, int]]] = []
+        # Nodo intermedio de cada atajo: {(u, w): v} significa u -> v -> w
+        self.medio: dict[tuple[int, int], int] = {}
+        # Precio del vuelo directo más barato entre dos aeropuertos (por ids)
+        self.directos: dict[tuple[int, int], float] = {}
+
+    @classmethod
+    @trazado()
+    def construir(cls, grafo: dict[str, list[tuple[str, float]]]) -> 'ContractionHierarchy':
+        """
+        Raises:
+            ValueError: Si algún precio no es un entero no negativo (ver es_exacta)
+        """
+        if not es_exacta(grafo):
+            raise ValueError("La jerarquía de contracción solo admite precios enteros no negativos")
+        jerarquia = cls()
+        jerarquia.firma = firma_grafo(grafo)
+        jerarquia._preprocesar(grafo)
+        return jerarquia
+
+    def _preprocesar(self, grafo: dict[str, list[tuple[str, float]]]) -> None:
+        nodos = set(grafo)
+        for destinos in grafo.values():
+            nodos.update(destino for destino, _ in destinos)
+        self.registro = RegistroAeropuertos(nodos)
+        ids = self.registro.ids
+        n = len(self.registro)
+        self.multiplicador = multiplicador = n + 1
+
+        # Grafo de trabajo con el vuelo más barato por par (los duplicados no aportan nada)
+        adyacencia: list[dict[int, int]] = [{} for _ in range(n)]
+        for origen, destinos in grafo.items():
+            i = ids[origen]
+            for destino, precio in destinos:
+                j = ids[destino]
+                if j == i:
+                    continue
+                peso = int(precio) * multiplicador + 1
+                if peso < adyacencia[i].get(j, INFINITO):
+                    adyacencia[i][j] = peso
+                    self.directos[(i, j)] = precio
+
+        vecinos_contraidos = [0] * n
+        niveles = [0] * n
+        cola = [(self._prioridad(adyacencia, nodo, self._atajos_necesarios(adyacencia, nodo),
+                                 vecinos_contraidos, niveles), nodo)
+                for nodo in range(n)]
+        heapq.heapify(cola)
+
+        self.rango = [0] * n
+        self.arriba = [[] for _ in range(n)]
+        siguiente_rango = 0
+        while cola:
+            _, nodo = heapq.heappop(cola)
+
+            # Actualización perezosa: si la prioridad empeoró, el nodo vuelve a la cola.
+            # Los atajos calculados aquí son los que se agregan si el nodo se contrae
+            atajos = self._atajos_necesarios(adyacencia, nodo)
+            prioridad = self._prioridad(adyacencia, nodo, atajos, vecinos_contraidos, niveles)
+            if cola and prioridad > cola[0][0]:
+                heapq.heappush(cola, (prioridad, nodo))
+                continue
+
+            # Las aristas que otro camino mejora nunca están en un camino mínimo: se
+            # quitan antes de contraer, así no llegan a las consultas
+            aristas = adyacencia[nodo]
+            self._podar_aristas(adyacencia, nodo)
+
+            self.rango[nodo] = siguiente_rango
+            siguiente_rango += 1
+            self.arriba[nodo] = list(aristas.items())
+
+            for u, w, peso in atajos:
+                if w in aristas and u in aristas and peso < adyacencia[u].get(w, INFINITO):
+                    adyacencia[u][w] = peso
+                    adyacencia[w][u] = peso
+                    self.medio[(u, w)] = nodo
+                    self.medio[(w, u)] = nodo
+
+            for vecino in aristas:
+                del adyacencia[vecino][nodo]
+                vecinos_contraidos[vecino] += 1
+                niveles[vecino] = max(niveles[vecino], niveles[nodo] + 1)
+            adyacencia[nodo] = {}
+
+    def _prioridad(self, adyacencia, nodo, atajos, vecinos_contraidos, niveles) -> int:
+        # Diferencia de aristas (atajos que habría que agregar menos aristas que desaparecen,
+        # con más peso para los atajos), más vecinos ya contraídos y nivel en la jerarquía:
+        # así la contracción se reparte por el grafo y la jerarquía queda menos profunda
+        return (self.PESO_ATAJOS * len(atajos) - len(adyacencia[nodo])
+                + vecinos_contraidos[nodo] + niveles[nodo])
+
+    def _podar_aristas(self, adyacencia, nodo) -> None:
+        aristas = adyacencia[nodo]
+        if not aristas:
+            return
+        distancias = self._buscar_testigos(adyacencia, nodo, -1, aristas)
+        for vecino, peso in list(aristas.items()):
+            if distancias.get(vecino, INFINITO) < peso:
+                del aristas[vecino]
+                del adyacencia[vecino][nodo]
+                self.medio.pop((nodo, vecino), None)
+                self.medio.pop((vecino, nodo), None)
+
+    def _atajos_necesarios(self, adyacencia, nodo) -> list[tuple[int, int, int]]:
+        vecinos = list(adyacencia[nodo].items())
+        atajos = []
+        for i, (u, peso_u) in enumerate(vecinos):
+            objetivos = {w: peso_u + peso_w for w, peso_w in vecinos[i + 1:]}
+            if not objetivos:
+                continue
+            testigos = self._buscar_testigos(adyacencia, u, nodo, objetivos)
+            for w, peso_via in objetivos.items():
+                if testigos.get(w, INFINITO) > peso_via:
+                    atajos.append((u, w, peso_via))
+        return atajos
+
+    def _buscar_testigos(self, adyacencia, origen, excluido, objetivos) -> dict[int, int]:
+        # Dijkstra local que evita el nodo a contraer y no pasa del peso máximo buscado.
+        # Es el bucle más caliente del preprocesamiento: las funciones van en variables locales
+        limite = max(objetivos.values())
+        distancias = {origen: 0}
+        obtener = distancias.get
+        cola = [(0, origen)]
+        empujar = heapq.heappush
+        sacar = heapq.heappop
+        pendientes = len(objetivos)
+        asentados = 0
+        limite_asentados = self.LIMITE_TESTIGOS
+        while cola and pendientes and asentados < limite_asentados:
+            peso_actual, nodo_actual = sacar(cola)
+            if peso_actual > distancias[nodo_actual]:
+                continue
+            asentados += 1
+            if nodo_actual in objetivos:
+                pendientes -= 1
+            for vecino, peso in adyacencia[nodo_actual].items():
+                nuevo_peso = peso_actual + peso
+                if nuevo_peso <= limite and nuevo_peso < obtener(vecino, INFINITO) and vecino != excluido:
+                    distancias[vecino] = nuevo_peso
+                    empujar(cola, (nuevo_peso, vecino))
+        return distancias
+
+    @trazado()
+    def encontrar_ruta_mas_barata(self, origen: str, destino: str) -> tuple[float, int, list[str]]:
+        """
+        Consulta equivalente a pathfinder.encontrar_ruta_mas_barata sobre el grafo preprocesado
+        (mismo costo y mismos vuelos; ante rutas empatadas en ambos puede devolver otra).
+
+        Returns:
+            tuple[float, int, list[str]]: (costo, vuelos, ruta) o (inf, 0, []) si no hay ruta
+        """
+        if origen == destino:
+            return 0, 0, [origen]
+        ids = self.registro.ids
+        if origen not in ids or destino not in ids:
+            return float('inf'), 0, []
+        origen_id = ids[origen]
+        destino_id = ids[destino]
+
+        arriba = self.arriba
+        distancias = ({origen_id: 0}, {destino_id: 0})
+        padres = ({origen_id: -1}, {destino_id: -1})
+        colas = ([(0, origen_id)], [(0, destino_id)])
+        mejor = INFINITO
+        encuentro = -1
+
+        while True:
+            # Avanzar por el lado cuya cola tenga el menor peso pendiente; un lado termina
+            # cuando su menor peso ya no puede mejorar el mejor encuentro
+            ida, vuelta = colas
+            ida_activa = bool(ida) and ida[0][0] < mejor
+            vuelta_activa = bool(vuelta) and vuelta[0][0] < mejor
+            if not ida_activa and not vuelta_activa:
+                break
+            lado = 0 if ida_activa and (not vuelta_activa or ida[0][0] <= vuelta[0][0]) else 1
+            cola = colas[lado]
+            distancias_lado = distancias[lado]
+
+            peso_actual, nodo_actual = heapq.heappop(cola)
+            if peso_actual > distancias_lado[nodo_actual]:
+                continue
+
+            peso_opuesto = distancias[1 - lado].get(nodo_actual)
+            if peso_opuesto is not None and peso_actual + peso_opuesto < mejor:
+                mejor = peso_actual + peso_opuesto
+                encuentro = nodo_actual
+
+            # Stall-on-demand: si un vecino de mayor rango ya alcanzado en esta dirección da
+            # un camino más corto hasta este nodo, ningún camino mínimo sube por aquí
+            aristas = arriba[nodo_actual]
+            estancado = False
+            for vecino, peso in aristas:
+                peso_vecino = distancias_lado.get(vecino)
+                if peso_vecino is not None and peso_vecino + peso < peso_actual:
+                    estancado = True
+                    break
+            if estancado:
+                continue
+
+            padres_lado = padres[lado]
+            for vecino, peso in aristas:
+                nuevo_peso = peso_actual + peso
+                if nuevo_peso < distancias_lado.get(vecino, INFINITO):
+                    distancias_lado[vecino] = nuevo_peso
+                    padres_lado[vecino] = nodo_actual
+                    heapq.heappush(cola, (nuevo_peso, vecino))
+
+        if encuentro == -1:
+            return float('inf'), 0, []
+
+        # Camino en la jerarquía: origen -> encuentro -> destino
+        camino = []
+        nodo = encuentro
+        while nodo != -1:
+            camino.append(nodo)
+            nodo = padres[0][nodo]
+        camino.reverse()
+        nodo = padres[1][encuentro]
+        while nodo != -1:
+            camino.append(nodo)
+            nodo = padres[1][nodo]
+
+        ruta = self._desempaquetar(camino)
+
+        # El costo se suma vuelo a vuelo en el mismo orden que lo hace Dijkstra
+        costo = 0
+        for i in range(len(ruta) - 1):
+            costo += self.directos[(ruta[i], ruta[i + 1])]
+        return costo, len(ruta) - 1, self.registro.a_codigos(ruta)
+
+    def _desempaquetar(self, camino: list[int]) -> list[int]:
+        # Reemplaza cada atajo por sus dos tramos hasta llegar a vuelos reales
+        ruta = [camino[0]]
+        for i in range(len(camino) - 1):
+            pila = [(camino[i], camino[i + 1])]
+            while pila:
+                u, w = pila.pop()
+                v = self.medio.get((u, w))
+                if v is None:
+                    ruta.append(w)
+                else:
+                    # Se apila primero el segundo tramo para procesar u -> v antes que v -> w
+                    pila.append((v, w))
+                    pila.append((u, v))
+        return ruta
+
+    def guardar(self, archivo: str) -> None:
+        datos = {
+            'firma': self.firma,
+            'codigos': self.registro.codigos,
+            'rango': self.rango,
+            'arriba': self.arriba,
+            'medio': [[u, w, v] for (u, w), v in self.medio.items()],
+            'directos': [[u, w, precio] for (u, w), precio in self.directos.items()],
+        }
+        with open(archivo, mode='w', encoding='utf-8') as f:
+            json.dump(datos, f)
+
+    @classmethod
+    def cargar(cls, archivo: str) -> 'ContractionHierarchy':
+        with open(archivo, mode='r', encoding='utf-8') as f:
+            datos = json.load(f)
+        jerarquia = cls()
+        jerarquia.firma = datos['firma']
+        jerarquia.registro = RegistroAeropuertos(datos['codigos'])
+        jerarquia.multiplicador = len(jerarquia.registro) + 1
+        jerarquia.rango = datos['rango']
+        jerarquia.arriba = [[tuple(arista) for arista in aristas] for aristas in datos['arriba']]
+        jerarquia.medio = {(u, w): v for u, w, v in datos['medio']}
+        jerarquia.directos = {(u, w): precio for u, w, precio in datos['directos']}
+        return jerarquia
+
+
+def obtener_jerarquia(grafo: dict[str, list[tuple[str, float]]],
+                      archivo: str | None = None) -> ContractionHierarchy | None:
+    """
+    Devuelve la jerarquía del grafo, reutilizando la guardada en `archivo` si corresponde
+    al mismo grafo (misma firma). Si no existe o quedó obsoleta, la reconstruye y la guarda.
+    Devuelve None si el grafo tiene precios no enteros: ahí hay que usar Dijkstra.
+    """
+    if not es_exacta(grafo):
+        return None
+    firma = firma_grafo(grafo)
+    if archivo and os.path.exists(archivo):
+        try:
+            jerarquia = ContractionHierarchy.cargar(archivo)
+            if jerarquia.firma == firma:
+                return jerarquia
+        except (json.JSONDecodeError, KeyError, ValueError, TypeError):
+            pass
+
+    jerarquia = ContractionHierarchy.construir(grafo)
+    if archivo:
+        jerarquia.guardar(archivo)
+    return jerarquia
@@ -0,0 +1,144 @@
+import threading
+
+from graph_index import DatosIndexados, firma_archivo
+from tracing import tramo
+from visa_rules import ReglasVisas
+
+
+class DataWatcher:
+    """
+    Vigila tarifas.json, visas.json y reglas_visas.json y mantiene una instantánea
+    indexada (DatosIndexados) siempre lista para las consultas.
+
+    Revisa la fecha de modificación y el tamaño de los archivos cada `intervalo`
+    segundos (sin inotify, funciona en cualquier sistema). Cuando cambian, reconstruye
+    los datos en su propio hilo y reemplaza la instantánea con una sola asignación: las
+    consultas en curso terminan con la instantánea que tomaron al empezar y las nuevas
+    ven la nueva, sin esperar a la recarga.
+
+    Si la nueva versión no se puede leer (por ejemplo un archivo a medio copiar), se
+    sigue usando la anterior y se reintenta cuando los archivos vuelvan a cambiar.
+    """
+
+    INTERVALO_S = 2.0
+
+    def __init__(self, archivo_visas: str = "visas.json", archivo_tarifas: str = "tarifas.json",
+                 archivo_reglas: str = "reglas_visas.json", intervalo: float | None = None,
+                 al_actualizar=None):
+        """
+        Args:
+            intervalo (float, optional): Segundos entre revisiones de los archivos
+            al_actualizar: Se llama con la nueva instantánea tras cada recarga, desde el
+                hilo del vigilante (en una GUI hay que pasarla al hilo de Tk)
+        """
+        self.archivos = (archivo_visas, archivo_tarifas, archivo_reglas)
+        self.intervalo = intervalo if intervalo is not None else self.INTERVALO_S
+        self.al_actualizar = al_actualizar
+        self.version = 0
+        self.ultimo_error: Exception | None = None
+
+        self._datos: DatosIndexados | None = None
+        self._firmas_cargadas = None
+        self._firmas_fallidas = None
+        self._cerrojo_carga = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def _firmas(self):
+        return tuple(firma_archivo(archivo) for archivo in self.archivos)
+
+    def obtener(self) -> DatosIndexados:
+        """
+        Instantánea actual. La primera vez la carga en el hilo que llama; las siguientes
+        devuelven la última versión sin bloquear.
+
+        Raises:
+            FileNotFoundError, json.JSONDecodeError: Si la carga inicial falla
+        """
+        datos = self._datos
+        if datos is not None:
+            return datos
+        with self._cerrojo_carga:
+            if self._datos is None:
+                self._recargar(self._firmas(), lanzar=True)
+            return self._datos
+
+    def iniciar(self) -> 'DataWatcher':
+        if self._hilo is None:
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._vigilar, name="DataWatcher", daemon=True)
+            self._hilo.start()
+        return self
+
+    def detener(self) -> None:
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def revisar(self) -> bool:
+        """
+        Revisa los archivos una vez y recarga si cambiaron.
+
+        Returns:
+            bool: True si se publicó una nueva instantánea
+        """
+        firmas = self._firmas()
+        if firmas == self._firmas_cargadas or firmas == self._firmas_fallidas:
+            return False
+        with self._cerrojo_carga:
+            if firmas == self._firmas_cargadas:
+                return False
+            return self._recargar(firmas, lanzar=False)
+
+    def _vigilar(self) -> None:
+        anteriores = None
+        while not self._detener.wait(self.intervalo):
+            # Solo se recarga cuando las firmas se repiten en dos revisiones seguidas:
+            # así no se lee un archivo que todavía se está escribiendo
+            firmas = self._firmas()
+            if firmas == anteriores:
+                self.revisar()
+            anteriores = firmas
+
+    def _recargar(self, firmas, lanzar: bool) -> bool:
+        # Las firmas se toman antes de leer: si un archivo cambia durante la lectura,
+        # la próxima revisión lo detecta y vuelve a cargar
+        try:
+            with tramo("DataWatcher.recargar", version=self.version + 1):
+                nuevos = DatosIndexados.leer(*self.archivos)
+                if self._datos is not None:
+                    self._preparar_perfiles(nuevos, self._datos)
+        except Exception as error:
+            self.ultimo_error = error
+            self._firmas_fallidas = firmas
+            if lanzar:
+                raise
+            return False
+
+        # Publicación atómica: una sola asignación de referencia
+        self._datos = nuevos
+        self._firmas_cargadas = firmas
+        self._firmas_fallidas = None
+        self.ultimo_error = None
+        self.version += 1
+        if self.al_actualizar is not None:
+            self.al_actualizar(nuevos)
+        return True
+
+    @staticmethod
+    def _preparar_perfiles(nuevos: DatosIndexados, anteriores: DatosIndexados) -> None:
+        # Los perfiles ya consultados se indexan antes de publicar la nueva versión,
+        # para que la primera consulta tras la recarga no tenga que construirlos
+        for perfil in list(anteriores.perfiles):
+            nacionalidad, visas = perfil.clave
+            if nacionalidad is ReglasVisas.NACIONALIDAD_GENERAL:
+                reglas = nuevos.reglas_generales
+            else:
+                reglas = nuevos.reglas
+            if reglas is not None and nacionalidad in reglas.nacionalidades:
+                nuevo = reglas.perfil(nacionalidad, visas)
+                nuevos.grafo(nuevo)
+                # Si el perfil ya tenía jerarquía de contracción, se rehace antes de publicar
+                if anteriores.jerarquias.get(perfil) is not None:
+                    nuevos.jerarquia(nuevo, esperar=True)
@@ -0,0 +1,380 @@
+import random
+import sys
+
+from airport_registry import RegistroAeropuertos
+from bfs_pathfinder import encontrar_ruta_menos_escalas_bfs
+from contraction_hierarchy import obtener_jerarquia
+from graph_index import IndiceGrafo
+from itinerary_planner import planificar_itinerario
+from parallel_search import resolver_lote
+from pathfinder import (arbol_rutas_mas_baratas, construir_grafo, encontrar_ruta_mas_barata,
+                        encontrar_ruta_mas_barata_ids)
+from synthetic_graphs import generar_codigos
+from visa_rules import ReglasVisas
+import vectorized_backend
+
+# Prueba diferencial: genera redes de tarifas y mapas de visas aleatorios, ejecuta cada
+# motor de búsqueda y compara con los de referencia (encontrar_ruta_mas_barata y
+# BFSPathfinder). Ante una diferencia reduce el caso hasta el contraejemplo más chico.
+# Uso:
+#   python differential_check.py [casos] [semilla]
+
+SIN_RUTA = (float('inf'), 0, [])
+
+
+class Caso:
+    """Una red de prueba: tarifas, requisitos de visa y si el pasajero tiene visa."""
+
+    def __init__(self, tarifas: list[tuple[str, str, float]], visas: dict[str, bool], tiene_visa: bool):
+        self.tarifas = tarifas
+        self.visas = visas
+        self.tiene_visa = tiene_visa
+
+    def permitidos(self) -> set[str]:
+        if self.tiene_visa:
+            return set(self.visas)
+        return {a for a, req in self.visas.items() if not req}
+
+    def consultas(self) -> list[tuple[str, str]]:
+        # Todos los pares, incluidos aeropuertos que quedan fuera del grafo por la visa
+        codigos = sorted(self.visas)
+        return [(origen, destino) for origen in codigos for destino in codigos]
+
+    def __repr__(self):
+        return f"Caso(tarifas={self.tarifas!r}, visas={self.visas!r}, tiene_visa={self.tiene_visa!r})"
+
+
+class Contraejemplo:
+    def __init__(self, motor: str, caso: Caso, consulta: tuple[str, str], esperado, obtenido):
+        self.motor = motor
+        self.caso = caso
+        self.consulta = consulta
+        self.esperado = esperado
+        self.obtenido = obtenido
+
+    def __str__(self):
+        origen, destino = self.consulta
+        return (f"Motor '{self.motor}' difiere en {origen} -> {destino}\n"
+                f"  esperado: {self.esperado!r}\n"
+                f"  obtenido: {self.obtenido!r}\n"
+                f"  {self.caso!r}")
+
+
+# --- Motores ---------------------------------------------------------------------------
+# Cada motor recibe (caso, grafo, consultas) y devuelve un resultado por consulta.
+
+def _perfil_caso(caso):
+    # Perfil de visa compilado (bitsets) equivalente a los requisitos simples del caso
+    reglas = ReglasVisas.desde_visas_simples(caso.visas)
+    nacionalidad = ReglasVisas.NACIONALIDAD_GENERAL
+    visas = reglas.paises_con_visa(nacionalidad) if caso.tiene_visa else ()
+    return reglas.perfil(nacionalidad, visas)
+
+
+def _grafo_por_perfil(caso):
+    # El mismo grafo, construido a partir del perfil compilado de visas (bitsets)
+    return construir_grafo(caso.tarifas, _perfil_caso(caso))
+
+
+def _motor_indice(caso, grafo, consultas):
+    indice = IndiceGrafo(grafo)
+    return [encontrar_ruta_mas_barata(grafo, o, d, indice=indice) for o, d in consultas]
+
+
+def _motor_perfil(caso, grafo, consultas):
+    grafo_perfil = _grafo_por_perfil(caso)
+    return [encontrar_ruta_mas_barata(grafo_perfil, o, d) for o, d in consultas]
+
+
+def _motor_ids(caso, grafo, consultas):
+    registro = RegistroAeropuertos(caso.visas)
+    adyacencia = registro.a_ids(grafo)
+    resultados = []
+    for origen, destino in consultas:
+        costo, escalas, ruta = encontrar_ruta_mas_barata_ids(adyacencia, registro.id(origen), registro.id(destino))
+        resultados.append((costo, escalas, registro.a_codigos(ruta)))
+    return resultados
+
+
+def _motor_arbol(caso, grafo, consultas):
+    arboles = {}
+    resultados = []
+    for origen, destino in consultas:
+        if origen not in arboles:
+            arboles[origen] = arbol_rutas_mas_baratas(grafo, origen)
+        resultados.append(arboles[origen].get(destino, SIN_RUTA))
+    return resultados
+
+
+def _motor_lote(caso, grafo, consultas):
+    return resolver_lote(grafo, consultas, procesos=1)
+
+
+def _motor_lote_procesos(caso, grafo, consultas):
+    # El mismo lote repartido en un pool de procesos real
+    return resolver_lote(grafo, consultas, procesos=2)
+
+
+def _motor_vectorizado(caso, grafo, consultas):
+    return vectorized_backend.resolver_lote(grafo, consultas, procesos=1)
+
+
+def _motor_jerarquia(caso, grafo, consultas):
+    # Como en DatosIndexados: con precios no enteros no hay jerarquía y se usa Dijkstra
+    jerarquia = obtener_jerarquia(grafo)
+    if jerarquia is None:
+        return [encontrar_ruta_mas_barata(grafo, o, d) for o, d in consultas]
+    return [jerarquia.encontrar_ruta_mas_barata(o, d) for o, d in consultas]
+
+
+def _motor_bfs_indice(caso, grafo, consultas):
+    indice = IndiceGrafo(grafo)
+    return [encontrar_ruta_menos_escalas_bfs(grafo, o, d, indice=indice) for o, d in consultas]
+
+
+def _motor_niveles(caso, grafo, consultas):
+    niveles = vectorized_backend.niveles_bfs(grafo, [origen for origen, _ in consultas])
+    return [niveles[origen].get(destino) for origen, destino in consultas]
+
+
+def _motor_itinerario(caso, grafo, consultas):
+    perfil = _perfil_caso(caso)
+    return [planificar_itinerario(grafo, [o, d], regreso=True, perfil=perfil)[:3] for o, d in consultas]
+
+
+def _referencia_barata(caso, grafo, consultas):
+    return [encontrar_ruta_mas_barata(grafo, o, d) for o, d in consultas]
+
+
+def _referencia_ida_vuelta(caso, grafo, consultas):
+    # Ida y vuelta como dos consultas sueltas, unidas en el aeropuerto de destino. Como en
+    # la interfaz, origen y destino tienen que ser aeropuertos donde el pasajero puede entrar
+    permitidos = caso.permitidos()
+    resultados = []
+    for origen, destino in consultas:
+        if origen not in permitidos or destino not in permitidos:
+            resultados.append(SIN_RUTA)
+            continue
+        ida = encontrar_ruta_mas_barata(grafo, origen, destino)
+        vuelta = encontrar_ruta_mas_barata(grafo, destino, origen)
+        if not ida[2] or not vuelta[2]:
+            resultados.append(SIN_RUTA)
+        else:
+            resultados.append((ida[0] + vuelta[0], ida[1] + vuelta[1], ida[2] + vuelta[2][1:]))
+    return resultados
+
+
+def _referencia_bfs(caso, grafo, consultas):
+    return [encontrar_ruta_menos_escalas_bfs(grafo, o, d) for o, d in consultas]
+
+
+# --- Comparaciones ---------------------------------------------------------------------
+
+def _igual(grafo, consulta, esperado, obtenido):
+    return esperado == obtenido
+
+
+def _costo_ruta(grafo, ruta):
+    # Suma vuelo a vuelo con el vuelo directo más barato, como lo hace Dijkstra
+    costo = 0
+    for origen, destino in zip(ruta, ruta[1:]):
+        precios = [precio for vecino, precio in grafo.get(origen, []) if vecino == destino]
+        if not precios:
+            return None
+        costo += min(precios)
+    return costo
+
+
+def _equivalente(grafo, consulta, esperado, obtenido):
+    # Mismo (costo, vuelos); la ruta puede ser otra de las empatadas, pero debe ser válida
+    if esperado[:2] != obtenido[:2]:
+        return False
+    ruta = obtenido[2]
+    if not esperado[2]:
+        return not ruta
+    return (ruta[0], ruta[-1]) == consulta and len(ruta) - 1 == obtenido[1] \
+        and _costo_ruta(grafo, ruta) == obtenido[0]
+
+
+def _mismo_nivel(grafo, consulta, esperado, obtenido):
+    # Niveles BFS frente a BFSPathfinder: mismos vuelos mínimos o ambos sin ruta
+    origen, destino = consulta
+    if origen == destino:
+        return obtenido == 0
+    if not esperado[2]:
+        return obtenido is None
+    return obtenido == len(esperado[2]) - 1
+
+
+# nombre: (referencia, motor, comparación, disponible)
+MOTORES = {
+    'indice_componentes': (_referencia_barata, _motor_indice, _igual, lambda: True),
+    'perfil_visa': (_referencia_barata, _motor_perfil, _igual, lambda: True),
+    'ids_enteros': (_referencia_barata, _motor_ids, _igual, lambda: True),
+    'arbol_rutas': (_referencia_barata, _motor_arbol, _igual, lambda: True),
+    'lote_paralelo': (_referencia_barata, _motor_lote, _igual, lambda: True),
+    'lote_procesos': (_referencia_barata, _motor_lote_procesos, _igual, lambda: True),
+    'vectorizado': (_referencia_barata, _motor_vectorizado, _igual, lambda: vectorized_backend.DISPONIBLE),
+    'jerarquia_contraccion': (_referencia_barata, _motor_jerarquia, _equivalente, lambda: True),
+    'itinerario_ida_vuelta': (_referencia_ida_vuelta, _motor_itinerario, _igual, lambda: True),
+    'bfs_indice': (_referencia_bfs, _motor_bfs_indice, _igual, lambda: True),
+    'niveles_bfs': (_referencia_bfs, _motor_niveles, _mismo_nivel, lambda: True),
+}
+
+
+def _invariantes(grafo, consulta, resultado):
+    # Semántica de referencia: (inf, 0, []) sin ruta; si hay ruta, vuelos = len(ruta) - 1
+    costo, escalas, ruta = resultado
+    if not ruta:
+        return resultado == SIN_RUTA
+    return escalas == len(ruta) - 1 and _costo_ruta(grafo, ruta) == costo
+
+
+def buscar_diferencia(nombre: str, caso: Caso) -> Contraejemplo | None:
+    """Ejecuta un motor sobre el caso y devuelve la primera consulta que no coincide."""
+    referencia, motor, comparar, _ = MOTORES[nombre]
+    grafo = construir_grafo(caso.tarifas, caso.permitidos())
+    consultas = caso.consultas()
+    esperados = referencia(caso, grafo, consultas)
+
+    if referencia is _referencia_barata:
+        for consulta, esperado in zip(consultas, esperados):
+            if consulta[0] != consulta[1] and not _invariantes(grafo, consulta, esperado):
+                return Contraejemplo('referencia', caso, consulta, "(inf, 0, []) o ruta coherente", esperado)
+
+    try:
+        obtenidos = motor(caso, grafo, consultas)
+    except Exception as error:
+        return Contraejemplo(nombre, caso, consultas[0] if consultas else ('', ''), "sin excepción", error)
+
+    for consulta, esperado, obtenido in zip(consultas, esperados, obtenidos):
+        if not comparar(grafo, consulta, esperado, obtenido):
+            return Contraejemplo(nombre, caso, consulta, esperado, obtenido)
+    return None
+
+
+def _reducir_lista(elementos, falla):
+    # Quita bloques cada vez más chicos mientras el caso siga fallando
+    tamano = max(1, len(elementos) // 2)
+    while elementos:
+        reducido = False
+        inicio = 0
+        while inicio < len(elementos):
+            candidato = elementos[:inicio] + elementos[inicio + tamano:]
+            if falla(candidato):
+                elementos = candidato
+                reducido = True
+            else:
+                inicio += tamano
+        if tamano == 1 and not reducido:
+            break
+        tamano = max(1, tamano // 2)
+    return elementos
+
+
+def reducir(nombre: str, caso: Caso) -> Contraejemplo:
+    """Achica el caso (tarifas, aeropuertos, visas, precios) conservando la diferencia."""
+    def falla(candidato):
+        return buscar_diferencia(nombre, candidato) is not None
+
+    tarifas = _reducir_lista(list(caso.tarifas), lambda t: falla(Caso(t, caso.visas, caso.tiene_visa)))
+    caso = Caso(tarifas, caso.visas, caso.tiene_visa)
+
+    # Aeropuertos: al quitar uno se quitan también sus tarifas
+    def con_aeropuertos(codigos):
+        visas = {codigo: caso.visas[codigo] for codigo in codigos}
+        return Caso([t for t in caso.tarifas if t[0] in visas and t[1] in visas], visas, caso.tiene_visa)
+
+    codigos = _reducir_lista(sorted(caso.visas), lambda c: falla(con_aeropuertos(c)))
+    caso = con_aeropuertos(codigos)
+
+    # Visas: quitar requisitos innecesarios
+    for codigo in sorted(caso.visas):
+        if caso.visas[codigo]:
+            candidato = Caso(caso.tarifas, {**caso.visas, codigo: False}, caso.tiene_visa)
+            if falla(candidato):
+                caso = candidato
+
+    # Precios: llevar cada uno al menor valor entero que conserve la falla
+    for i, (origen, destino, precio) in enumerate(caso.tarifas):
+        for menor in (1.0, float(int(precio))):
+            if menor >= precio:
+                continue
+            tarifas = caso.tarifas[:i] + [(origen, destino, menor)] + caso.tarifas[i + 1:]
+            candidato = Caso(tarifas, caso.visas, caso.tiene_visa)
+            if falla(candidato):
+                caso = candidato
+                break
+
+    return buscar_diferencia(nombre, caso)
+
+
+# Familias de precios de los casos aleatorios:
+#   medios     -> múltiplos de 0.5 (sumas exactas en float, muchos empates)
+#   enteros    -> enteros: los motores exactos (backend vectorizado, jerarquía) no se saltean
+#   decimales  -> precios como 9.99 o 29.99: las sumas en float redondean y el resultado
+#                 depende del orden en que se suman
+FAMILIAS = ('medios', 'enteros', 'decimales')
+PRECIOS_DECIMALES = (9.99, 10.01, 19.99, 20.0, 29.99, 30.0, 49.99, 0.1, 0.2, 0.3)
+
+
+def caso_aleatorio(rng: random.Random, familia: str | None = None) -> Caso:
+    """
+    Red chica con muchos empates: tarifas repetidas entre el mismo par, algunos
+    aeropuertos que exigen visa y precios de una de las FAMILIAS (al azar si no se indica).
+    """
+    familia = familia or rng.choice(FAMILIAS)
+    num_aeropuertos = rng.randint(2, 9)
+    codigos = generar_codigos(num_aeropuertos)
+    precio_max = rng.choice((2, 4, 20))
+    tarifas = []
+    for _ in range(rng.randint(0, num_aeropuertos * 3)):
+        origen, destino = rng.choice(codigos), rng.choice(codigos)
+        if origen == destino:
+            continue
+        if familia == 'medios':
+            precio = rng.randint(2, 2 * precio_max) / 2
+        elif familia == 'enteros':
+            precio = float(rng.randint(1, precio_max))
+        else:
+            precio = rng.choice(PRECIOS_DECIMALES)
+        tarifas.append((origen, destino, precio))
+    proporcion = rng.choice((0.0, 0.2, 0.5))
+    visas = {codigo: rng.random() < proporcion for codigo in codigos}
+    return Caso(tarifas, visas, rng.random() < 0.3)
+
+
+def verificar_motores(num_casos: int = 500, semilla: int = 0,
+                      motores: list[str] | None = None) -> list[Contraejemplo]:
+    """
+    Ejecuta todos los motores disponibles sobre casos aleatorios.
+
+    Returns:
+        list[Contraejemplo]: El contraejemplo reducido de cada motor que falló (vacía si todo coincide)
+    """
+    nombres = [nombre for nombre in (motores or MOTORES) if MOTORES[nombre][3]()]
+    rng = random.Random(semilla)
+    fallidos = {}
+    for _ in range(num_casos):
+        caso = caso_aleatorio(rng)
+        for nombre in nombres:
+            if nombre not in fallidos and buscar_diferencia(nombre, caso) is not None:
+                fallidos[nombre] = reducir(nombre, caso)
+    return list(fallidos.values())
+
+
+def benchmark_diferencial(num_casos: int = 500, semilla: int = 0) -> None:
+    disponibles = [nombre for nombre, motor in MOTORES.items() if motor[3]()]
+    print(f"Prueba diferencial: {num_casos} casos, motores: {', '.join(disponibles)}")
+    contraejemplos = verificar_motores(num_casos, semilla)
+    for contraejemplo in contraejemplos:
+        print(contraejemplo)
+    if contraejemplos:
+        raise AssertionError(f"{len(contraejemplos)} motor(es) no coinciden con la referencia")
+    print("  Todos los motores coinciden con la referencia")
+
+
+if __name__ == "__main__":
+    casos = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    semilla = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    benchmark_diferencial(casos, semilla)
@@ -0,0 +1,254 @@
+import os
+import threading
+
+from airport_registry import RegistroAeropuertos
+from contraction_hierarchy import ContractionHierarchy, obtener_jerarquia
+from data_loader import cargar_visas, cargar_tarifas, leer_visas, leer_tarifas
+from pathfinder import construir_grafo
+from tracing import trazado
+from visa_rules import PerfilVisa, ReglasVisas, cargar_reglas_visas, leer_reglas_visas
+
+
+class IndiceGrafo:
+    """
+    Índice de un grafo calculado una sola vez: componentes conexas (union-find),
+    grado de cada aeropuerto (destinos distintos) y ranking de hubs.
+
+    Como construir_grafo agrega cada vuelo en ambos sentidos, dos aeropuertos de
+    componentes distintas nunca tienen ruta entre sí: conectados() lo responde en O(1)
+    sin recorrer el grafo.
+    """
+
+    @trazado("IndiceGrafo")
+    def __init__(self, grafo: dict[str, list[tuple[str, float]]]):
+        padres = {nodo: nodo for nodo in grafo}
+        tamanos = {nodo: 1 for nodo in grafo}
+
+        def raiz(nodo):
+            # Compresión de caminos por división a la mitad
+            while padres[nodo] != nodo:
+                padres[nodo] = padres[padres[nodo]]
+                nodo = padres[nodo]
+            return nodo
+
+        self.grados: dict[str, int] = {}
+        for nodo, conexiones in grafo.items():
+            destinos = {destino for destino, _ in conexiones}
+            self.grados[nodo] = len(destinos)
+            for destino in destinos:
+                a, b = raiz(nodo), raiz(destino)
+                if a == b:
+                    continue
+                # Unión por tamaño
+                if tamanos[a] < tamanos[b]:
+                    a, b = b, a
+                padres[b] = a
+                tamanos[a] += tamanos[b]
+
+        # Numerar las componentes de forma densa
+        self.componentes: dict[str, int] = {}
+        self.tamanos_componentes: list[int] = []
+        numeros = {}
+        for nodo in grafo:
+            r = raiz(nodo)
+            if r not in numeros:
+                numeros[r] = len(self.tamanos_componentes)
+                self.tamanos_componentes.append(tamanos[r])
+            self.componentes[nodo] = numeros[r]
+
+        # Hubs de mayor a menor grado (los empates conservan el orden del grafo)
+        self._hubs = sorted(self.grados.items(), key=lambda x: x[1], reverse=True)
+
+    @property
+    def num_componentes(self) -> int:
+        return len(self.tamanos_componentes)
+
+    def conectados(self, origen: str, destino: str) -> bool:
+        """True si puede existir una ruta de origen a destino (misma componente)."""
+        if origen == destino:
+            return True
+        componente = self.componentes.get(origen)
+        return componente is not None and componente == self.componentes.get(destino)
+
+    def tamano_componente(self, nodo: str) -> int:
+        """Cantidad de aeropuertos alcanzables desde el nodo (incluido él mismo)."""
+        componente = self.componentes.get(nodo)
+        return 0 if componente is None else self.tamanos_componentes[componente]
+
+    def hubs(self, cantidad: int | None = None) -> list[tuple[str, int]]:
+        """Aeropuertos con más conexiones directas: [(aeropuerto, grado), ...]"""
+        return self._hubs if cantidad is None else self._hubs[:cantidad]
+
+    def mas_conectado(self) -> tuple[str, int] | None:
+        return self._hubs[0] if self._hubs else None
+
+    def menos_conectado(self) -> tuple[str, int] | None:
+        return min(self.grados.items(), key=lambda x: x[1]) if self.grados else None
+
+
+class DatosIndexados:
+    """
+    Datos de vuelos cargados una vez, con el grafo y el índice de cada perfil de visa.
+
+    Los perfiles salen de visas.json (nacionalidad general, con o sin visa) o, si existe,
+    de reglas_visas.json (por nacionalidad). El grafo y el índice de cada perfil se
+    construyen la primera vez que se consultan y se reutilizan en las siguientes.
+
+    `registro` da ids enteros a todos los aeropuertos conocidos; lo comparten las reglas
+    de visa (bitsets) y la versión por ids del grafo de cada perfil.
+
+    Los perfiles con grafos grandes pueden tener además una jerarquía de contracción
+    (ver jerarquia), que se construye en segundo plano.
+    """
+
+    # Aeropuertos a partir de los cuales conviene la jerarquía de contracción: en grafos
+    # más chicos Dijkstra ya responde en menos de un milisegundo
+    MIN_AEROPUERTOS_JERARQUIA = 1000
+
+    def __init__(self, visas: dict, tarifas: list[tuple[str, str, float]],
+                 reglas: ReglasVisas | None = None):
+        self.visas = visas
+        self.tarifas = tarifas
+        self.todos_aeropuertos = set(visas.keys())
+        if reglas is not None:
+            self.todos_aeropuertos |= set(reglas.paises)
+
+        # Los grafos de los perfiles solo contienen aeropuertos con requisitos de visa conocidos
+        self.registro = RegistroAeropuertos(self.todos_aeropuertos)
+        self.reglas_generales = ReglasVisas.desde_visas_simples(visas, self.registro)
+        self.reglas = reglas.con_registro(self.registro) if reglas is not None else None
+
+        self.perfiles: dict[PerfilVisa, tuple[dict, IndiceGrafo, list]] = {}
+        # Jerarquía de cada perfil: None mientras se construye o si no corresponde
+        self.jerarquias: dict[PerfilVisa, ContractionHierarchy | None] = {}
+        self._cerrojo = threading.Lock()
+        # Los dos perfiles de visas.json se indexan al cargar
+        for tiene_visa in (True, False):
+            self._grafo_e_indice(self.perfil(tiene_visa))
+
+    @property
+    def nacionalidades(self) -> list[str]:
+        return sorted(self.reglas.nacionalidades) if self.reglas is not None else []
+
+    def perfil(self, tiene_visa: bool, nacionalidad: str | None = None) -> PerfilVisa:
+        """
+        Perfil de visa del pasajero. Sin nacionalidad se usa visas.json; con visa se
+        asume que tiene la de todos los países que se la exigen.
+
+        Raises:
+            KeyError: Si la nacionalidad no tiene reglas
+        """
+        if nacionalidad is None or self.reglas is None:
+            reglas, nacionalidad = self.reglas_generales, ReglasVisas.NACIONALIDAD_GENERAL
+        else:
+            reglas = self.reglas
+        visas = reglas.paises_con_visa(nacionalidad) if tiene_visa else ()
+        return reglas.perfil(nacionalidad, visas)
+
+    @classmethod
+    def leer(cls, archivo_visas: str = "visas.json", archivo_tarifas: str = "tarifas.json",
+             archivo_reglas: str = "reglas_visas.json") -> 'DatosIndexados':
+        """
+        Lee e indexa los archivos sin terminar el programa ante un error (lo usa la
+        recarga en segundo plano, que debe conservar los datos anteriores).
+
+        Raises:
+            FileNotFoundError: Si falta visas.json o tarifas.json
+            json.JSONDecodeError: Si algún archivo no es JSON válido
+        """
+        reglas = leer_reglas_visas(archivo_reglas) if os.path.exists(archivo_reglas) else None
+        return cls(leer_visas(archivo_visas), leer_tarifas(archivo_tarifas), reglas)
+
+    def _grafo_e_indice(self, perfil: PerfilVisa | bool) -> tuple[dict, IndiceGrafo, list]:
+        if isinstance(perfil, bool):
+            perfil = self.perfil(perfil)
+        with self._cerrojo:
+            guardado = self.perfiles.get(perfil)
+            if guardado is None:
+                # construir_grafo solo prueba `in perfil`: O(1) por aeropuerto
+                grafo = construir_grafo(self.tarifas, perfil)
+                guardado = (grafo, IndiceGrafo(grafo), self.registro.a_ids(grafo))
+                self.perfiles[perfil] = guardado
+            return guardado
+
+    def grafo(self, perfil: PerfilVisa | bool) -> dict:
+        return self._grafo_e_indice(perfil)[0]
+
+    def indice(self, perfil: PerfilVisa | bool) -> IndiceGrafo:
+        return self._grafo_e_indice(perfil)[1]
+
+    def adyacencia(self, perfil: PerfilVisa | bool) -> list[list[tuple[int, float]]]:
+        """Grafo del perfil indexado por los ids de `registro`."""
+        return self._grafo_e_indice(perfil)[2]
+
+    def jerarquia(self, perfil: PerfilVisa | bool, esperar: bool = False) -> ContractionHierarchy | None:
+        """
+        Jerarquía de contracción del grafo del perfil, o None si todavía no está lista.
+
+        Solo se construye para grafos de al menos MIN_AEROPUERTOS_JERARQUIA aeropuertos
+        con precios enteros (con decimales no daría exactamente el costo de Dijkstra). La
+        primera vez que se pide se construye en un hilo aparte y mientras tanto se
+        devuelve None: hay que buscar con Dijkstra.
+
+        Args:
+            esperar (bool): Construirla en el hilo que llama y devolverla ya lista
+        """
+        if isinstance(perfil, bool):
+            perfil = self.perfil(perfil)
+        with self._cerrojo:
+            if perfil in self.jerarquias:
+                return self.jerarquias[perfil]
+            self.jerarquias[perfil] = None
+
+        grafo = self.grafo(perfil)
+        if len(grafo) < self.MIN_AEROPUERTOS_JERARQUIA:
+            return None
+        if esperar:
+            return self._construir_jerarquia(perfil, grafo)
+        threading.Thread(target=self._construir_jerarquia, args=(perfil, grafo),
+                         name="ContractionHierarchy", daemon=True).start()
+        return None
+
+    def _construir_jerarquia(self, perfil: PerfilVisa, grafo: dict) -> ContractionHierarchy | None:
+        # obtener_jerarquia devuelve None si algún precio no es entero
+        jerarquia = obtener_jerarquia(grafo)
+        with self._cerrojo:
+            self.jerarquias[perfil] = jerarquia
+        return jerarquia
+
+
+def firma_archivo(ruta: str) -> tuple[int, int] | None:
+    """(mtime en ns, tamaño) del archivo, o None si no existe."""
+    try:
+        estado = os.stat(ruta)
+    except OSError:
+        return None
+    return estado.st_mtime_ns, estado.st_size
+
+
+_cache_datos = {}
+_cerrojo_datos = threading.Lock()
+
+
+@trazado()
+def cargar_datos_indexados(archivo_visas: str = "visas.json",
+                           archivo_tarifas: str = "tarifas.json",
+                           archivo_reglas: str = "reglas_visas.json") -> DatosIndexados:
+    """
+    Carga visas, tarifas y reglas por nacionalidad e indexa los perfiles de visa. El
+    resultado se reutiliza mientras los archivos no cambien (misma fecha de
+    modificación y tamaño). El archivo de reglas es opcional.
+    """
+    clave = (archivo_visas, archivo_tarifas, archivo_reglas)
+    firmas = (firma_archivo(archivo_visas), firma_archivo(archivo_tarifas), firma_archivo(archivo_reglas))
+
+    with _cerrojo_datos:
+        guardado = _cache_datos.get(clave)
+        if guardado is not None and None not in firmas[:2] and guardado[0] == firmas:
+            return guardado[1]
+
+        # Si falta un archivo, los cargadores informan el error como siempre
+        datos = DatosIndexados(cargar_visas(archivo_visas), cargar_tarifas(archivo_tarifas),
+                               cargar_reglas_visas(archivo_reglas))
+        _cache_datos[clave] = (firmas, datos)
+        return datos
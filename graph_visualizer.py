@@ -2,6 +2,10 @@ import tkinter as tk
 from tkinter import Canvas
 import math
 import random
+from force_layout import calcular_layout, escalar_posiciones
+from pathfinder import firma_grafo
+from svg_canvas import SVGCanvas
+from tracing import trazado
 
 class GraphVisualizer:
     """
@@ -9,44 +13,63 @@ class GraphVisualizer:
     Dibuja nodos (aeropuertos) y aristas (rutas) en una ventana Tkinter.
     """
     
-    def __init__(self, parent: tk.Tk | tk.Toplevel, grafo: dict, ruta_resaltada: list = None):
+    # A partir de este número de nodos el layout circular se reemplaza por uno de fuerzas
+    UMBRAL_LAYOUT_FUERZAS = 30
+    
+    def __init__(self, parent: tk.Tk | tk.Toplevel | None, grafo: dict, ruta_resaltada: list = None,
+                 lienzo=None):
         """
         Constructor del visualizador de grafos.
         
         Args:
-            parent (tk.Tk | tk.Toplevel): Ventana padre de Tkinter
+            parent (tk.Tk | tk.Toplevel | None): Ventana padre de Tkinter (None si se usa `lienzo`)
             grafo (dict): Diccionario con estructura {aeropuerto: [(destino, precio), ...]}
                          Ejemplo: {'CCS': [('AUA', 40), ('CUR', 35)], ...}
             ruta_resaltada (list, optional): Lista de aeropuertos que forman la ruta óptima
                                            Ejemplo: ['CCS', 'AUA', 'SXM', 'SBH']
+            lienzo (optional): Lienzo alternativo con la interfaz de tkinter.Canvas
+                               (por ejemplo SVGCanvas); si se indica no se abre ninguna ventana
         """
-        # Crear ventana secundaria (Toplevel) que depende de la ventana padre
-        self.window = tk.Toplevel(parent)
-        self.window.title("Visualización del Grafo de Vuelos")
-        self.window.geometry("800x600")  # Tamaño: 800 píxeles ancho x 600 alto
-        
-        # Canvas: lienzo donde se dibujarán todos los elementos gráficos
-        # width/height: dimensiones del área de dibujo
-        # bg: color de fondo (blanco)
-        self.canvas = Canvas(self.window, width=800, height=600, bg="white")
-        self.canvas.pack(fill=tk.BOTH, expand=True)  # Expandir para llenar toda la ventana
+        if lienzo is not None:
+            # Dibujado sin ventana (exportación)
+            self.window = None
+            self.canvas = lienzo
+        else:
+            # Crear ventana secundaria (Toplevel) que depende de la ventana padre
+            self.window = tk.Toplevel(parent)
+            self.window.title("Visualización del Grafo de Vuelos")
+            self.window.geometry("800x600")  # Tamaño: 800 píxeles ancho x 600 alto
+            
+            # Canvas: lienzo donde se dibujarán todos los elementos gráficos
+            # width/height: dimensiones del área de dibujo
+            # bg: color de fondo (blanco)
+            self.canvas = Canvas(self.window, width=800, height=600, bg="white")
+            self.canvas.pack(fill=tk.BOTH, expand=True)  # Expandir para llenar toda la ventana
+            
+            # Botón para cerrar la ventana
+            tk.Button(self.window, text="Cerrar", command=self.window.destroy).pack(pady=5)
         
         # Almacenar datos del grafo
         self.grafo = grafo  # dict: estructura de nodos y conexiones
+        self._firma_grafo = firma_grafo(grafo)  # str: huella del grafo, para comparar en actualizar_ruta
         self.ruta_resaltada = ruta_resaltada if ruta_resaltada else []  # list: ruta a destacar
         self.posiciones = {}  # dict: almacenará {nodo: (x, y)} las coordenadas de cada aeropuerto
         
-        # Botón para cerrar la ventana
-        tk.Button(self.window, text="Cerrar", command=self.window.destroy).pack(pady=5)
+        # Ids de los elementos del canvas, para poder actualizarlos sin redibujar todo
+        self._items_nodos = {}    # dict: {nodo: (id_circulo, id_texto)}
+        self._items_aristas = {}  # dict: {(nodo_a, nodo_b): (id_linea, id_precio)}
+        self._items_ruta = []     # list: ids de las flechas y números de paso de la ruta
         
         # Proceso de dibujado: calcular posiciones y luego dibujar
         self._calcular_posiciones()
         self._dibujar_grafo()
     
+    @trazado()
     def _calcular_posiciones(self) -> None:
         """
         Calcula las posiciones (x, y) de cada nodo en un layout circular.
-        Distribuye los nodos uniformemente alrededor de un círculo.
+        Distribuye los nodos uniformemente alrededor de un círculo; con más de
+        UMBRAL_LAYOUT_FUERZAS nodos usa el layout dirigido por fuerzas.
         
         Returns:
             None: Modifica self.posiciones directamente
@@ -58,6 +81,12 @@ class GraphVisualizer:
         # Si no hay nodos, no hay nada que calcular
         if num_nodos == 0:
             return
+        
+        # Con muchos nodos el círculo se vuelve ilegible: layout dirigido por fuerzas
+        # (calcular_layout guarda el resultado, reabrir la ventana no lo recalcula)
+        if num_nodos > self.UMBRAL_LAYOUT_FUERZAS:
+            self.posiciones = escalar_posiciones(calcular_layout(self.grafo), 40, 40, 720, 520)
+            return
             
         # Centro del canvas (punto central del círculo)
         centro_x, centro_y = 400, 300  # int, int: coordenadas del centro
@@ -82,6 +111,7 @@ class GraphVisualizer:
             # Guardar posición calculada
             self.posiciones[nodo] = (x, y)  # tuple[float, float]
     
+    @trazado()
     def _dibujar_grafo(self) -> None:
         """
         Orquesta el proceso completo de dibujado del grafo.
@@ -151,7 +181,7 @@ class GraphVisualizer:
                 
                 # Dibujar línea entre origen y destino
                 # create_line(x1, y1, x2, y2, opciones...)
-                self.canvas.create_line(x1, y1, x2, y2, 
+                linea_id = self.canvas.create_line(x1, y1, x2, y2, 
                                        fill="gray",     # color: gris
                                        width=1,         # grosor: 1 píxel
                                        tags="arista")   # etiqueta para agrupar
@@ -165,11 +195,14 @@ class GraphVisualizer:
                 offset_y = -10  # int: desplazamiento vertical en píxeles
                 
                 # Mostrar precio de la ruta
-                self.canvas.create_text(mid_x + offset_x, mid_y + offset_y,
+                precio_id = self.canvas.create_text(mid_x + offset_x, mid_y + offset_y,
                                       text=f"${precio:.0f}",  # formato: $40
                                       font=("Arial", 8),      # fuente y tamaño
                                       fill="darkgreen",       # color del texto
                                       tags="precio")          # etiqueta
+                
+                # Guardar los ids para actualizaciones posteriores
+                self._items_aristas[conexion] = (linea_id, precio_id)
     
     def _dibujar_nodos(self) -> None:
         """
@@ -185,16 +218,7 @@ class GraphVisualizer:
             # x, y: float, float (coordenadas del centro del nodo)
             
             # Determinar colores según si el nodo está en la ruta resaltada
-            if nodo in self.ruta_resaltada:
-                # Colores para nodos en la ruta óptima
-                color = "red"              # str: color de relleno
-                outline_color = "darkred"  # str: color del borde
-                text_color = "white"       # str: color del texto
-            else:
-                # Colores para nodos normales
-                color = "lightblue"        # str: color de relleno
-                outline_color = "darkblue" # str: color del borde
-                text_color = "black"       # str: color del texto
+            color, outline_color, text_color = self._colores_nodo(nodo in self.ruta_resaltada)
             
             # Radio del círculo en píxeles
             radio = 25  # int: tamaño fijo para todos los nodos
@@ -202,7 +226,7 @@ class GraphVisualizer:
             # Dibujar círculo (óvalo con mismo ancho y alto)
             # create_oval(x1, y1, x2, y2) donde (x1,y1) es esquina sup-izq
             # y (x2,y2) es esquina inf-der del rectángulo que contiene el óvalo
-            self.canvas.create_oval(x - radio, y - radio,   # esquina superior izquierda
+            circulo_id = self.canvas.create_oval(x - radio, y - radio,   # esquina superior izquierda
                                    x + radio, y + radio,     # esquina inferior derecha
                                    fill=color,               # color de relleno
                                    outline=outline_color,    # color del borde
@@ -210,11 +234,27 @@ class GraphVisualizer:
                                    tags="nodo")              # etiqueta
             
             # Dibujar etiqueta del aeropuerto (código IATA)
-            self.canvas.create_text(x, y,              # posición central
+            texto_id = self.canvas.create_text(x, y,              # posición central
                                    text=nodo,           # texto: código del aeropuerto
                                    font=("Arial", 10, "bold"),  # fuente, tamaño, estilo
                                    fill=text_color,     # color del texto
                                    tags="etiqueta")     # etiqueta
+            
+            # Guardar los ids para poder recolorear el nodo sin redibujarlo
+            self._items_nodos[nodo] = (circulo_id, texto_id)
+    
+    def _colores_nodo(self, en_ruta: bool) -> tuple[str, str, str]:
+        """
+        Colores de un nodo según si pertenece a la ruta resaltada.
+        
+        Returns:
+            tuple[str, str, str]: (relleno, borde, texto)
+        """
+        if en_ruta:
+            # Colores para nodos en la ruta óptima
+            return "red", "darkred", "white"
+        # Colores para nodos normales
+        return "lightblue", "darkblue", "black"
     
     def _resaltar_ruta(self) -> None:
         """
@@ -243,7 +283,7 @@ class GraphVisualizer:
                 x2, y2 = self.posiciones[destino] # float, float
                 
                 # Dibujar flecha roja para indicar dirección
-                self.canvas.create_line(x1, y1, x2, y2, 
+                flecha_id = self.canvas.create_line(x1, y1, x2, y2, 
                                        fill="red",           # color: rojo
                                        width=3,              # grosor: 3 píxeles
                                        arrow=tk.LAST,        # flecha al final
@@ -255,8 +295,106 @@ class GraphVisualizer:
                 mid_y = (y1 + y2) / 2  # float
                 
                 # Mostrar número de paso en la ruta
-                self.canvas.create_text(mid_x - 15, mid_y + 15,  # posición con offset
+                paso_id = self.canvas.create_text(mid_x - 15, mid_y + 15,  # posición con offset
                                       text=f"Paso {i+1}",         # texto: "Paso 1", "Paso 2", etc.
                                       font=("Arial", 9, "bold"),  # fuente
                                       fill="red",                 # color
-                                      tags="paso_ruta")           # etiqueta 
\ No newline at end of file
+                                      tags="paso_ruta")           # etiqueta
+                
+                self._items_ruta.extend((flecha_id, paso_id))
+    
+    def esta_abierta(self) -> bool:
+        """
+        Indica si la ventana del visualizador sigue abierta (o si dibuja sin ventana).
+        
+        Returns:
+            bool: True si todavía se puede actualizar
+        """
+        return self.window is None or bool(self.window.winfo_exists())
+    
+    @trazado()
+    def actualizar_ruta(self, ruta_resaltada: list, grafo: dict = None) -> None:
+        """
+        Cambia la ruta resaltada reutilizando lo ya dibujado.
+        
+        Si el grafo es el mismo, solo se recolorean los nodos que entran o salen de la
+        ruta y se rehace la superposición de la ruta: O(largo de la ruta) en lugar de
+        redibujar todo el grafo. Si el grafo cambió (por ejemplo otro perfil de visa),
+        se redibuja completo.
+        
+        Args:
+            ruta_resaltada (list): Nueva ruta a destacar (vacía para no destacar ninguna)
+            grafo (dict, optional): Grafo de la nueva consulta
+        """
+        ruta_resaltada = ruta_resaltada or []
+        
+        if grafo is not None and grafo is not self.grafo:
+            # Cada consulta construye su propio dict: se compara el contenido (la huella
+            # del grafo actual ya está guardada, solo se calcula la del nuevo)
+            firma = firma_grafo(grafo)
+            if firma != self._firma_grafo:
+                self.grafo = grafo
+                self._firma_grafo = firma
+                self.ruta_resaltada = ruta_resaltada
+                self.canvas.delete("all")
+                self.posiciones = {}
+                self._items_nodos = {}
+                self._items_aristas = {}
+                self._items_ruta = []
+                self._calcular_posiciones()
+                self._dibujar_grafo()
+                return
+            self.grafo = grafo
+        
+        # Recolorear solo los nodos cuyo estado cambió
+        anteriores = set(self.ruta_resaltada)
+        nuevos = set(ruta_resaltada)
+        for nodo in anteriores ^ nuevos:
+            if nodo not in self._items_nodos:
+                continue
+            circulo_id, texto_id = self._items_nodos[nodo]
+            color, outline_color, text_color = self._colores_nodo(nodo in nuevos)
+            self.canvas.itemconfig(circulo_id, fill=color, outline=outline_color)
+            self.canvas.itemconfig(texto_id, fill=text_color)
+        
+        # Reemplazar la superposición de la ruta
+        if self._items_ruta:
+            self.canvas.delete(*self._items_ruta)
+            self._items_ruta = []
+        self.ruta_resaltada = ruta_resaltada
+        if self.ruta_resaltada:
+            self._resaltar_ruta()
+
+
+def exportar_svg(grafo: dict, ruta_resaltada: list = None, archivo: str = None) -> str:
+    """
+    Dibuja el grafo (y la ruta, si se indica) sin abrir ninguna ventana.
+    
+    Args:
+        grafo (dict): {aeropuerto: [(destino, precio), ...]}
+        ruta_resaltada (list, optional): Ruta a destacar
+        archivo (str, optional): Si se indica, el SVG se guarda en ese archivo
+    
+    Returns:
+        str: Documento SVG
+    """
+    visualizador = GraphVisualizer(None, grafo, ruta_resaltada, lienzo=SVGCanvas(800, 600))
+    if archivo:
+        visualizador.canvas.guardar(archivo)
+    return visualizador.canvas.a_svg()
+
+
+def exportar_rutas_svg(grafo: dict, rutas: list[list[str]], archivos: list[str]) -> None:
+    """
+    Exporta una imagen por ruta reutilizando el dibujo del grafo: se dibuja una sola vez
+    y para cada ruta solo se actualizan los nodos que cambian y el resaltado.
+    
+    Args:
+        grafo (dict): {aeropuerto: [(destino, precio), ...]}
+        rutas (list[list[str]]): Rutas a resaltar, una por imagen
+        archivos (list[str]): Archivo SVG de destino de cada ruta
+    """
+    visualizador = GraphVisualizer(None, grafo, lienzo=SVGCanvas(800, 600))
+    for ruta, archivo in zip(rutas, archivos):
+        visualizador.actualizar_ruta(ruta)
+        visualizador.canvas.guardar(archivo)
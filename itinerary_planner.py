@@ -0,0 +1,210 @@
+import argparse
+import sys
+
+from graph_index import IndiceGrafo, cargar_datos_indexados
+from pathfinder import arbol_rutas_mas_baratas
+from tracing import trazado
+from visa_rules import PerfilVisa
+
+# Itinerarios de varias ciudades (CCS -> SXM -> SBH -> CCS) en una sola consulta.
+# Se calcula un árbol de rutas más baratas por parada y cada tramo se lee de esos
+# árboles: un viaje de N ciudades cuesta N búsquedas en vez de una por tramo y par.
+# Uso:
+#   python itinerary_planner.py CCS SXM SBH [--regreso] [--libre] [--sin-visa] [--nacionalidad VEN]
+
+SIN_ITINERARIO = (float('inf'), 0, [], [])
+
+# Paradas intermedias máximas en orden libre: Held-Karp es O(2^n * n^2)
+MAX_PARADAS_LIBRES = 12
+
+
+def _tramo(arboles, origen, destino):
+    return arboles[origen].get(destino, (float('inf'), 0, []))
+
+
+def _unir_tramos(tramos):
+    # Cada tramo empieza donde terminó el anterior: no se repite el aeropuerto de conexión
+    costo = sum(tramo[0] for tramo in tramos)
+    escalas = sum(tramo[1] for tramo in tramos)
+    ruta = list(tramos[0][2])
+    for _, _, ruta_tramo in tramos[1:]:
+        ruta.extend(ruta_tramo[1:])
+    return costo, escalas, ruta, tramos
+
+
+def _orden_optimo(arboles, origen, intermedias, regreso, cancelacion=None):
+    """
+    Held-Karp: orden de las paradas intermedias con menor (costo, vuelos) saliendo de
+    `origen` y, si `regreso`, volviendo a él. Sin regreso el viaje termina en la última
+    parada visitada, la que resulte más barata. Ante empates gana el primer orden hallado.
+
+    Returns:
+        list[str] | None: Paradas en orden (sin el origen), o None si no hay itinerario
+    """
+    n = len(intermedias)
+    sin_camino = (float('inf'), 0)
+    costos = {}
+    for a in [origen] + intermedias:
+        for b in intermedias + [origen]:
+            costo, escalas, _ = _tramo(arboles, a, b)
+            costos[a, b] = (costo, escalas)
+
+    # mejor[mascara][j]: mejor (costo, vuelos) visitando `mascara` y terminando en j
+    mejor = [[sin_camino] * n for _ in range(1 << n)]
+    anterior = [[-1] * n for _ in range(1 << n)]
+    for j, parada in enumerate(intermedias):
+        mejor[1 << j][j] = costos[origen, parada]
+
+    for mascara in range(1, 1 << n):
+        if cancelacion is not None:
+            cancelacion.verificar()
+        for j in range(n):
+            actual = mejor[mascara][j]
+            if not mascara & (1 << j) or actual[0] == float('inf'):
+                continue
+            for k in range(n):
+                if mascara & (1 << k):
+                    continue
+                paso = costos[intermedias[j], intermedias[k]]
+                candidato = (actual[0] + paso[0], actual[1] + paso[1])
+                siguiente = mascara | (1 << k)
+                if candidato < mejor[siguiente][k]:
+                    mejor[siguiente][k] = candidato
+                    anterior[siguiente][k] = j
+
+    completa = (1 << n) - 1
+    final = -1
+    mejor_total = sin_camino
+    for j in range(n):
+        total = mejor[completa][j]
+        if regreso:
+            vuelta = costos[intermedias[j], origen]
+            total = (total[0] + vuelta[0], total[1] + vuelta[1])
+        if total < mejor_total:
+            mejor_total = total
+            final = j
+    if final == -1:
+        return None
+
+    orden = []
+    mascara = completa
+    while final != -1:
+        orden.append(intermedias[final])
+        final, mascara = anterior[mascara][final], mascara & ~(1 << final)
+    orden.reverse()
+    return orden
+
+
+@trazado()
+def planificar_itinerario(grafo: dict[str, list[tuple[str, float]]],
+                          paradas: list[str],
+                          ordenado: bool = True,
+                          regreso: bool = False,
+                          cancelacion=None,
+                          indice: IndiceGrafo | None = None,
+                          perfil: PerfilVisa | None = None) -> tuple[float, int, list[str], list[tuple[float, int, list[str]]]]:
+    """
+    Itinerario más barato que recorre todas las paradas saliendo de la primera.
+
+    Cada tramo es la ruta más barata entre dos paradas consecutivas (la misma que
+    devuelve encontrar_ruta_mas_barata), tomada del árbol de rutas de su parada de salida.
+
+    Args:
+        grafo (dict): Grafo de conexiones {aeropuerto: [(destino, precio), ...]}
+        paradas (list): Aeropuertos a visitar; el primero es el de salida
+        ordenado (bool): Si es False, las paradas después de la primera se visitan en el
+            orden que dé el menor costo total (hasta MAX_PARADAS_LIBRES)
+        regreso (bool): Si es True, el itinerario termina volviendo a la primera parada
+        cancelacion (CancellationToken, optional): Permite abortar la búsqueda
+        indice (IndiceGrafo, optional): Si se pasa, descarta sin buscar los itinerarios
+            con paradas en componentes distintos
+        perfil (PerfilVisa, optional): Perfil de visa del pasajero. El grafo del perfil
+            incluye aeropuertos donde solo puede hacer escala; con el perfil, un
+            itinerario con alguna parada donde no puede entrar no tiene solución
+
+    Returns:
+        tuple: (costo_total, vuelos_totales, ruta_completa, tramos), donde cada tramo es
+            (costo, vuelos, ruta). Si algún tramo no tiene ruta: (inf, 0, [], [])
+
+    Raises:
+        ValueError: Si no hay paradas o hay demasiadas para el orden libre
+    """
+    if not paradas:
+        raise ValueError("El itinerario necesita al menos una parada")
+
+    origen = paradas[0]
+    if ordenado:
+        intermedias = list(paradas[1:])
+    else:
+        # En orden libre cada ciudad se visita una vez; el origen ya está incluido
+        intermedias = [parada for parada in dict.fromkeys(paradas[1:]) if parada != origen]
+        if len(intermedias) > MAX_PARADAS_LIBRES:
+            raise ValueError(f"Demasiadas paradas en orden libre ({len(intermedias)}); "
+                             f"el máximo es {MAX_PARADAS_LIBRES}")
+
+    # Cada parada (también el origen, donde empieza y, con regreso, termina el viaje) es
+    # una entrada al país: no basta con poder transitar
+    if perfil is not None and any(not perfil.puede_entrar(parada) for parada in [origen] + intermedias):
+        return SIN_ITINERARIO
+
+    if indice is not None and any(not indice.conectados(origen, parada) for parada in intermedias):
+        return SIN_ITINERARIO
+
+    # Un árbol por parada de salida de algún tramo
+    salidas = [origen] + intermedias if (regreso or not ordenado) else [origen] + intermedias[:-1]
+    arboles = {}
+    for parada in salidas:
+        if parada not in arboles:
+            arboles[parada] = arbol_rutas_mas_baratas(grafo, parada, cancelacion)
+
+    if not ordenado and intermedias:
+        orden = _orden_optimo(arboles, origen, intermedias, regreso, cancelacion)
+        if orden is None:
+            return SIN_ITINERARIO
+        intermedias = orden
+
+    recorrido = [origen] + intermedias + ([origen] if regreso else [])
+    if len(recorrido) == 1:
+        return 0, 0, [origen], []
+
+    tramos = [_tramo(arboles, a, b) for a, b in zip(recorrido, recorrido[1:])]
+    if any(not ruta for _, _, ruta in tramos):
+        return SIN_ITINERARIO
+    return _unir_tramos(tramos)
+
+
+def _formatear(resultado) -> str:
+    costo, vuelos, ruta, tramos = resultado
+    if not ruta:
+        return "No hay itinerario posible con esas paradas."
+    lineas = [f"Costo total: ${costo:.2f} en {vuelos} vuelo(s)", f"Ruta: {' -> '.join(ruta)}"]
+    for numero, (costo_tramo, vuelos_tramo, ruta_tramo) in enumerate(tramos, 1):
+        lineas.append(f"  Tramo {numero}: {' -> '.join(ruta_tramo)} (${costo_tramo:.2f}, {vuelos_tramo} vuelo(s))")
+    return "\n".join(lineas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Itinerario más barato por varias ciudades")
+    parser.add_argument("paradas", nargs="+", help="Códigos IATA; el primero es la salida")
+    parser.add_argument("--regreso", action="store_true", help="Volver a la ciudad de salida")
+    parser.add_argument("--libre", action="store_true", help="Elegir el orden más barato de las paradas")
+    parser.add_argument("--sin-visa", action="store_true", help="El pasajero no tiene visa")
+    parser.add_argument("--nacionalidad", help="Nacionalidad para las reglas de visa (reglas_visas.json)")
+    argumentos = parser.parse_args()
+
+    datos = cargar_datos_indexados()
+    paradas = [datos.registro.normalizar(parada) for parada in argumentos.paradas]
+    desconocidas = [parada for parada in paradas if parada not in datos.registro]
+    if desconocidas:
+        sys.exit(f"Aeropuertos desconocidos: {', '.join(desconocidas)}")
+    if argumentos.nacionalidad and argumentos.nacionalidad not in datos.nacionalidades:
+        sys.exit(f"Nacionalidad sin reglas de visa: {argumentos.nacionalidad}")
+
+    perfil = datos.perfil(not argumentos.sin_visa, argumentos.nacionalidad)
+    sin_entrada = [parada for parada in dict.fromkeys(paradas) if not perfil.puede_entrar(parada)]
+    if sin_entrada:
+        sys.exit(f"El pasajero no puede entrar en: {', '.join(sin_entrada)} (requieren visa)")
+
+    resultado = planificar_itinerario(datos.grafo(perfil), paradas, ordenado=not argumentos.libre,
+                                      regreso=argumentos.regreso, indice=datos.indice(perfil), perfil=perfil)
+    print(_formatear(resultado))
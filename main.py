@@ -1,154 +1,230 @@
-from data_loader import cargar_visas, cargar_tarifas
-from pathfinder import construir_grafo, encontrar_ruta_mas_barata
+from graph_index import cargar_datos_indexados
+from pathfinder import encontrar_ruta_mas_barata_ids
+from airport_registry import RegistroAeropuertos
 from bfs_pathfinder import encontrar_ruta_menos_escalas_bfs
 from graph_visualizer import GraphVisualizer
 from complete_graph_visualizer import CompleteGraphVisualizer
+from query_worker import QueryWorker
+from route_result import ResultadoRuta
+from data_watcher import DataWatcher
+from visa_rules import cargar_reglas_visas
+from tracing import activar, trazado
+import argparse
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, ttk
 
 
 #Orquesta la aplicación: saluda, pide datos, procesa y muestra resultados.
+# La carga de archivos y la búsqueda se hacen en segundo plano (ver _lanzar_busqueda).
 def iniciar_consulta(origen, destino, tiene_visa, resultado_label, root):
-    
-    #print("✈️  Bienvenido al sistema de consulta de vuelos de Metro Travel ✈️")
-    #print("-" * 60)
-
-    # 1. Cargar datos usando nuestro módulo
-    visas = cargar_visas()
-    tarifas = cargar_tarifas()
-    todos_aeropuertos = set(visas.keys())
-
-    # 2. Interactuar con el usuario (esto después lo cambian apra agregarle el UI de usuario)
-    # ORIGEN
-    origen = origen.get().upper()
-    if origen not in todos_aeropuertos:
-        messagebox.showerror("Error", f"El aeropuerto de origen '{origen}' no es válido.")
-        return
+    _lanzar_busqueda("barata", origen, destino, tiene_visa, resultado_label, root)
 
-    # DESTINO
-    destino_final = destino.get().upper()
-    if destino_final not in todos_aeropuertos:
-        messagebox.showerror("Error", f"El aeropuerto de destino '{destino_final}' no es válido.")
-        return
+def buscar_menos_escalas(origen, destino, tiene_visa, resultado_label, root):
+    """
+    Busca la ruta con menos escalas usando BFS (Breadth-First Search).
+    
+    BFS garantiza encontrar la ruta con el mínimo número de escalas,
+    ya que explora el grafo nivel por nivel.
+    """
+    _lanzar_busqueda("escalas", origen, destino, tiene_visa, resultado_label, root)
 
+def _lanzar_busqueda(tipo, origen, destino, tiene_visa, resultado_label, root):
+    """
+    Lee los datos del formulario (en el hilo de Tk) y envía la búsqueda al trabajador
+    en segundo plano. Los clics repetidos con los mismos datos se ignoran.
+    """
+    origen = RegistroAeropuertos.normalizar(origen.get())
+    destino_final = RegistroAeropuertos.normalizar(destino.get())
     tiene_visa = tiene_visa.get()
+    nacionalidad = _nacionalidad_elegida(root)
 
-    #print("-" * 60)
+    enviada = root.trabajador.enviar(
+        (tipo, origen, destino_final, tiene_visa, nacionalidad),
+        # La instantánea de datos se toma en el hilo de trabajo al empezar la consulta
+        lambda cancelacion: _buscar_ruta(tipo, origen, destino_final, tiene_visa, cancelacion, nacionalidad,
+                                         root.vigilante.obtener()),
+        al_terminar=lambda resultado: _mostrar_resultado(resultado, resultado_label, root),
+        al_fallar=lambda error: _mostrar_error(error, resultado_label, root),
+        al_cancelar=lambda: _mostrar_cancelacion(resultado_label, root),
+    )
+    if enviada:
+        resultado_label.config(text=f"Buscando ruta desde {origen} hacia {destino_final}...")
+        root.progreso.start(10)
+        root.cancelar_btn.config(state="normal")
 
-    # 3. Aplicar la lógica de negocio y obtener resultados
+# Texto de la opción del combo que usa los requisitos generales de visas.json. Lleva
+# paréntesis para no coincidir con ningún código de nacionalidad de reglas_visas.json
+OPCION_GENERAL = "(general)"
+# Cada cuánto se revisa si el vigilante publicó datos nuevos para el combo
+INTERVALO_NACIONALIDADES_MS = 1000
 
-    # Lógica para determinar aeropuertos permitidos
-    if tiene_visa:
-        aeropuertos_permitidos = todos_aeropuertos
-    else:
-        aeropuertos_permitidos = {a for a, req in visas.items() if not req}
+def _nacionalidad_elegida(root):
+    """
+    Nacionalidad del combo, o None para usar los requisitos generales de visas.json
+    (la opción OPCION_GENERAL del combo)
+    """
+    nacionalidad = root.nacionalidad_var.get()
+    return None if nacionalidad == OPCION_GENERAL else nacionalidad
 
-    # Verificar si el origen o el destino requieren visa y el pasajero no la tiene
-    if origen not in aeropuertos_permitidos:
-        resultado_label.config(text=f"El aeropuerto de origen '{origen}' requiere visa y el pasajero no la posee.")
-        return
-    if destino_final not in aeropuertos_permitidos:
-        resultado_label.config(text=f"El aeropuerto de destino '{destino_final}' requiere visa y el pasajero no la posee.")
-        return
+def _actualizar_nacionalidades(root):
+    """
+    Se ejecuta en el hilo de Tk: cuando el vigilante publica una nueva versión de los
+    datos, rehace las opciones del combo con las nacionalidades de esa instantánea.
+    Si la elegida ya no existe se vuelve a la opción general.
+    """
+    version = root.vigilante.version
+    if version > 0 and version != root.version_nacionalidades:
+        root.version_nacionalidades = version
+        nacionalidades = root.vigilante.obtener().nacionalidades
+        root.nacionalidad_combo.config(values=[OPCION_GENERAL] + nacionalidades)
+        if root.nacionalidad_var.get() not in nacionalidades:
+            root.nacionalidad_var.set(OPCION_GENERAL)
+    root.after(INTERVALO_NACIONALIDADES_MS, _actualizar_nacionalidades, root)
 
+def _mensaje_aeropuerto_invalido(campo, codigo, registro):
+    """Mensaje de aeropuerto inválido con los códigos parecidos, si los hay"""
+    mensaje = f"El aeropuerto de {campo} '{codigo}' no es válido."
+    sugerencias = registro.sugerencias(codigo)
+    if sugerencias:
+        mensaje += f" ¿Quiso decir {', '.join(sugerencias)}?"
+    return mensaje
 
-    # Usamos las funciones de nuestro módulo pathfinder
-    grafo = construir_grafo(tarifas, aeropuertos_permitidos)
-    costo, escalas, ruta = encontrar_ruta_mas_barata(grafo, origen, destino_final)
-
-    # 4. Presentar resultados
-    if costo != float('inf'):
-        vuelos_totales = len(ruta) - 1
-        escalas = max(0, len(ruta) - 2)
-        resultado = (
-            f"🎉 ¡Ruta más económica encontrada! 🎉\n"
-            f"Ruta: {' -> '.join(ruta)}\n"
-            f"Costo Total: ${costo:,.2f}\n"
-            f"Vuelos totales: {vuelos_totales}\n"
-            f"Escalas: {escalas}"
-        )
-        
-        # Habilitar botón para ver grafo con ruta
-        visualizar_ruta_btn.config(
-            state="normal",
-            command=lambda: GraphVisualizer(root, grafo, ruta)
-        )
-    else:
-        resultado = f"No se encontró una ruta posible desde {origen} hacia {destino_final}."
-        visualizar_ruta_btn.config(state="disabled")
-        
-    resultado_label.config(text=resultado)
-    
-    # Guardar el grafo actual para poder visualizarlo
-    root.grafo_actual = grafo
-
-def buscar_menos_escalas(origen, destino, tiene_visa, resultado_label, root):
+@trazado()
+def _buscar_ruta(tipo, origen, destino_final, tiene_visa, cancelacion, nacionalidad=None, datos=None):
     """
-    Busca la ruta con menos escalas usando BFS (Breadth-First Search).
-    
-    BFS garantiza encontrar la ruta con el mínimo número de escalas,
-    ya que explora el grafo nivel por nivel.
+    Se ejecuta en el hilo de trabajo: carga datos, valida, construye el grafo y busca.
+    No toca ningún widget; devuelve un dict que _mostrar_resultado presenta
+    ({'resultado': ResultadoRuta, 'grafo': ...}, o {'error': ...} / {'aviso': ...}).
+    `datos` es la instantánea del vigilante de archivos; toda la consulta usa esa versión
+    aunque los archivos se recarguen mientras tanto.
     """
-    # 1. Cargar datos
-    visas = cargar_visas()
-    tarifas = cargar_tarifas()
-    todos_aeropuertos = set(visas.keys())
+    # 1. Cargar datos (se reutilizan, ya indexados, mientras los archivos no cambien)
+    if datos is None:
+        datos = cargar_datos_indexados()
+    registro = datos.registro
 
     # 2. Validar entrada
-    origen_str = origen.get().upper()
-    if origen_str not in todos_aeropuertos:
-        messagebox.showerror("Error", f"El aeropuerto de origen '{origen_str}' no es válido.")
-        return
+    if origen not in registro:
+        return {'error': _mensaje_aeropuerto_invalido("origen", origen, registro)}
+    if destino_final not in registro:
+        return {'error': _mensaje_aeropuerto_invalido("destino", destino_final, registro)}
 
-    destino_str = destino.get().upper()
-    if destino_str not in todos_aeropuertos:
-        messagebox.showerror("Error", f"El aeropuerto de destino '{destino_str}' no es válido.")
-        return
+    # La nacionalidad viene del combo, que pudo llenarse con una versión anterior de
+    # reglas_visas.json
+    if nacionalidad is not None and nacionalidad not in datos.nacionalidades:
+        return {'error': f"La nacionalidad '{nacionalidad}' no está disponible en las reglas de visa actuales."}
 
-    tiene_visa_bool = tiene_visa.get()
+    # 3. Perfil de visa del pasajero (compilado una vez y reutilizado entre consultas)
+    perfil = datos.perfil(tiene_visa, nacionalidad)
 
-    # 3. Determinar aeropuertos permitidos
-    if tiene_visa_bool:
-        aeropuertos_permitidos = todos_aeropuertos
+    # Verificar si el origen o el destino requieren visa y el pasajero no la tiene
+    # (en las escalas basta con poder transitar; eso lo resuelve el grafo del perfil)
+    if not perfil.puede_entrar(origen):
+        return {'aviso': f"El aeropuerto de origen '{origen}' requiere visa y el pasajero no la posee."}
+    if not perfil.puede_entrar(destino_final):
+        return {'aviso': f"El aeropuerto de destino '{destino_final}' requiere visa y el pasajero no la posee."}
+
+    # 4. Tomar el grafo del perfil y buscar ruta (la búsqueda revisa el token de cancelación;
+    # con el índice, un destino en otra componente se descarta sin recorrer el grafo)
+    grafo = datos.grafo(perfil)
+    indice = datos.indice(perfil)
+    cancelacion.verificar()
+    # En redes grandes la jerarquía de contracción (construida en segundo plano) da el
+    # mismo costo y vuelos que Dijkstra visitando muchos menos aeropuertos
+    jerarquia = datos.jerarquia(perfil) if tipo == "barata" else None
+    if tipo == "escalas":
+        costo, escalas, ruta = encontrar_ruta_menos_escalas_bfs(grafo, origen, destino_final, cancelacion, indice)
+    elif not indice.conectados(origen, destino_final):
+        costo, escalas, ruta = float('inf'), 0, []
+    elif jerarquia is not None:
+        costo, escalas, ruta = jerarquia.encontrar_ruta_mas_barata(origen, destino_final)
     else:
-        aeropuertos_permitidos = {a for a, req in visas.items() if not req}
+        # Dijkstra sobre los ids enteros del registro (mismo resultado, bucle más rápido)
+        costo, escalas, ruta_ids = encontrar_ruta_mas_barata_ids(
+            datos.adyacencia(perfil), registro.id(origen), registro.id(destino_final), cancelacion)
+        ruta = registro.a_codigos(ruta_ids)
+
+    resultado = ResultadoRuta.desde_busqueda(tipo, origen, destino_final, (costo, escalas, ruta), grafo)
+    return {'resultado': resultado, 'grafo': grafo}
+
+def _terminar_progreso(root):
+    root.progreso.stop()
+    root.cancelar_btn.config(state="disabled")
 
-    # Verificar restricciones de visa
-    if origen_str not in aeropuertos_permitidos:
-        resultado_label.config(text=f"El aeropuerto de origen '{origen_str}' requiere visa y el pasajero no la posee.")
+def _mostrar_resultado(resultado, resultado_label, root):
+    """Presenta el resultado de _buscar_ruta (se ejecuta en el hilo de Tk)"""
+    _terminar_progreso(root)
+
+    if 'error' in resultado:
+        resultado_label.config(text="")
+        messagebox.showerror("Error", resultado['error'])
         return
-    if destino_str not in aeropuertos_permitidos:
-        resultado_label.config(text=f"El aeropuerto de destino '{destino_str}' requiere visa y el pasajero no la posee.")
+    if 'aviso' in resultado:
+        resultado_label.config(text=resultado['aviso'])
         return
 
-    # 4. Construir grafo y buscar ruta con BFS
-    grafo = construir_grafo(tarifas, aeropuertos_permitidos)
-    costo, escalas, ruta = encontrar_ruta_menos_escalas_bfs(grafo, origen_str, destino_str)
-
-    # 5. Presentar resultados
-    if costo != float('inf'):
-        vuelos_totales = len(ruta) - 1
-        resultado = (
-            f"✈️ ¡Ruta con menos escalas encontrada! ✈️\n"
-            f"Ruta: {' -> '.join(ruta)}\n"
-            f"Costo Total: ${costo:,.2f}\n"
-            f"Vuelos totales: {vuelos_totales}\n"
-            f"Escalas: {escalas}\n"
-            f"(Optimizado para menos escalas usando BFS)"
-        )
+    grafo = resultado['grafo']
+    resultado_ruta = resultado['resultado']
+    ruta = resultado_ruta.ruta
+
+    # Presentar resultados
+    if resultado_ruta.encontrada:
+        if resultado_ruta.tipo == "escalas":
+            texto = (
+                f"✈️ ¡Ruta con menos escalas encontrada! ✈️\n"
+                f"Ruta: {' -> '.join(ruta)}\n"
+                f"Costo Total: ${resultado_ruta.costo:,.2f}\n"
+                f"Vuelos totales: {resultado_ruta.vuelos}\n"
+                f"Escalas: {resultado_ruta.escalas}\n"
+                f"(Optimizado para menos escalas usando BFS)"
+            )
+        else:
+            texto = (
+                f"🎉 ¡Ruta más económica encontrada! 🎉\n"
+                f"Ruta: {' -> '.join(ruta)}\n"
+                f"Costo Total: ${resultado_ruta.costo:,.2f}\n"
+                f"Vuelos totales: {resultado_ruta.vuelos}\n"
+                f"Escalas: {resultado_ruta.escalas}"
+            )
         
         # Habilitar botón para ver grafo con ruta
         visualizar_ruta_btn.config(
             state="normal",
-            command=lambda: GraphVisualizer(root, grafo, ruta)
+            command=lambda: mostrar_grafo_con_ruta(root, grafo, ruta)
         )
     else:
-        resultado = f"No se encontró una ruta posible desde {origen_str} hacia {destino_str}."
+        texto = f"No se encontró una ruta posible desde {resultado_ruta.origen} hacia {resultado_ruta.destino}."
         visualizar_ruta_btn.config(state="disabled")
+
+    # Si el visualizador ya está abierto, actualizarlo con la nueva ruta (sin ruta no
+    # debe quedar resaltada la de la consulta anterior)
+    visualizador = getattr(root, 'visualizador_ruta', None)
+    if visualizador is not None and visualizador.esta_abierta():
+        visualizador.actualizar_ruta(ruta, grafo)
         
-    resultado_label.config(text=resultado)
+    resultado_label.config(text=texto)
+    
+    # Guardar el grafo actual para poder visualizarlo
     root.grafo_actual = grafo
 
+def mostrar_grafo_con_ruta(root, grafo, ruta):
+    """Muestra la ruta en el visualizador abierto o abre uno nuevo si no hay ninguno"""
+    visualizador = getattr(root, 'visualizador_ruta', None)
+    if visualizador is not None and visualizador.esta_abierta():
+        visualizador.actualizar_ruta(ruta, grafo)
+        visualizador.window.lift()
+    else:
+        root.visualizador_ruta = GraphVisualizer(root, grafo, ruta)
+
+def _mostrar_error(error, resultado_label, root):
+    _terminar_progreso(root)
+    resultado_label.config(text="")
+    messagebox.showerror("Error", f"La consulta falló: {error}")
+
+def _mostrar_cancelacion(resultado_label, root):
+    _terminar_progreso(root)
+    resultado_label.config(text="Búsqueda cancelada.")
+
 def visualizar_todas_las_rutas(root):
     """Muestra TODAS las rutas del archivo tarifas.json sin filtros"""
     CompleteGraphVisualizer(root)
@@ -170,9 +246,20 @@ def iniciar_gui():
     destino_entry = tk.Entry(main_frame, font=("Arial", 10), width=20)
     destino_entry.grid(row=1, column=1, padx=5, pady=5)
 
+    # Nacionalidad (reglas_visas.json) y si tiene visa
+    pasajero_frame = tk.Frame(main_frame)
+    pasajero_frame.grid(row=2, columnspan=2, pady=5)
+    reglas = cargar_reglas_visas()
+    nacionalidades = sorted(reglas.nacionalidades) if reglas is not None else []
+    root.nacionalidad_var = tk.StringVar(value=OPCION_GENERAL)
+    tk.Label(pasajero_frame, text="Nacionalidad:", font=("Arial", 10)).pack(side=tk.LEFT, padx=5)
+    root.nacionalidad_combo = ttk.Combobox(pasajero_frame, textvariable=root.nacionalidad_var,
+                                           state="readonly", width=10, values=[OPCION_GENERAL] + nacionalidades)
+    root.nacionalidad_combo.pack(side=tk.LEFT, padx=5)
+
     tiene_visa = tk.BooleanVar()
     root.tiene_visa_var = tiene_visa  # Guardar referencia para uso posterior
-    tk.Checkbutton(main_frame, text="¿Tiene visa?", variable=tiene_visa, font=("Arial", 10)).grid(row=2, columnspan=2, pady=5)
+    tk.Checkbutton(pasajero_frame, text="¿Tiene visa?", variable=tiene_visa, font=("Arial", 10)).pack(side=tk.LEFT, padx=5)
 
     # Frame para botones
     button_frame = tk.Frame(main_frame)
@@ -210,9 +297,28 @@ def iniciar_gui():
     )
     visualizar_todas_btn.grid(row=1, column=1, padx=5, pady=3)
 
+    # Progreso de la búsqueda en segundo plano y botón para cancelarla
+    progreso_frame = tk.Frame(main_frame)
+    progreso_frame.grid(row=4, columnspan=2, pady=5)
+    root.progreso = ttk.Progressbar(progreso_frame, mode="indeterminate", length=250)
+    root.progreso.pack(side=tk.LEFT, padx=5)
+    root.cancelar_btn = tk.Button(
+        progreso_frame, text="Cancelar", state="disabled",
+        command=lambda: root.trabajador.cancelar(),
+        font=("Arial", 10)
+    )
+    root.cancelar_btn.pack(side=tk.LEFT, padx=5)
+    root.trabajador = QueryWorker(root)
+
+    # Recarga los archivos de datos en segundo plano cuando cambian
+    root.vigilante = DataWatcher().iniciar()
+    # Las nacionalidades del combo siguen a las recargas de reglas_visas.json
+    root.version_nacionalidades = 0
+    _actualizar_nacionalidades(root)
+
     # Área de resultados
     resultado_frame = tk.LabelFrame(main_frame, text="Resultado", font=("Arial", 10, "bold"))
-    resultado_frame.grid(row=4, columnspan=2, padx=5, pady=10, sticky="ew")
+    resultado_frame.grid(row=5, columnspan=2, padx=5, pady=10, sticky="ew")
     
     resultado_label = tk.Label(resultado_frame, text="", fg="blue", wraplength=400, justify="left", font=("Arial", 10))
     resultado_label.pack(padx=10, pady=10)
@@ -220,4 +326,12 @@ def iniciar_gui():
     root.mainloop()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Metro Travel - Consulta de Vuelos")
+    parser.add_argument("--traza", metavar="ARCHIVO",
+                        help="guarda los tiempos de cada etapa en formato Chrome trace (JSON)")
+    parser.add_argument("--perfil", action="store_true", help="con --traza, perfila con cProfile")
+    parser.add_argument("--memoria", action="store_true", help="con --traza, mide memoria con tracemalloc")
+    argumentos = parser.parse_args()
+    if argumentos.traza:
+        activar(argumentos.traza, perfilar=argumentos.perfil, memoria=argumentos.memoria)
     iniciar_gui()
\ No newline at end of file
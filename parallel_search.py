@@ -0,0 +1,159 @@
+import gc
+import multiprocessing
+import os
+
+from airport_registry import RegistroAeropuertos
+from pathfinder import arbol_rutas_mas_baratas, encontrar_ruta_mas_barata_ids
+from tracing import trazado
+
+SIN_RUTA = (float('inf'), 0, [])
+
+# Grafo de un proceso trabajador, ya preparado (ver _preparar_grafo). Solo se asigna en
+# los trabajadores (cada uno pertenece a un único pool); el proceso principal guarda el
+# suyo en cada ejecutor.
+_grafo_trabajador = None
+
+
+def _preparar_grafo(grafo):
+    # El grafo junto con su versión por ids: las consultas sueltas usan la búsqueda con
+    # heap sobre ids, que termina al llegar al destino
+    nodos = set(grafo)
+    for conexiones in grafo.values():
+        nodos.update(destino for destino, _ in conexiones)
+    registro = RegistroAeropuertos(nodos)
+    return grafo, registro, registro.a_ids(grafo)
+
+
+def _inicializar_trabajador(grafo):
+    # Con 'fork' el argumento se hereda copy-on-write; con 'spawn'/'forkserver' se envía
+    # una sola vez por trabajador
+    global _grafo_trabajador
+    _grafo_trabajador = _preparar_grafo(grafo)
+
+
+def _resolver_grupo(preparado, origen, consultas):
+    grafo, registro, adyacencia = preparado
+    if len(consultas) == 1:
+        # Una sola consulta: Dijkstra con heap hasta el destino (mismo resultado que
+        # encontrar_ruta_mas_barata, sin armar el árbol completo)
+        indice, destino = consultas[0]
+        if origen == destino:
+            return [(indice, (0, 0, [origen]))]
+        if origen not in registro or destino not in registro:
+            return [(indice, SIN_RUTA)]
+        costo, escalas, ruta = encontrar_ruta_mas_barata_ids(adyacencia, registro.id(origen), registro.id(destino))
+        return [(indice, (costo, escalas, registro.a_codigos(ruta)))]
+
+    # Varias consultas con el mismo origen se resuelven con un único árbol de rutas
+    arbol = arbol_rutas_mas_baratas(grafo, origen)
+    return [(indice, arbol.get(destino, SIN_RUTA)) for indice, destino in consultas]
+
+
+def _resolver_tarea(preparado, tarea):
+    resultados = []
+    for origen, consultas in tarea:
+        resultados.extend(_resolver_grupo(preparado, origen, consultas))
+    return resultados
+
+
+def _resolver_tarea_trabajador(tarea):
+    return _resolver_tarea(_grafo_trabajador, tarea)
+
+
+def _particionar(consultas, num_tareas):
+    # Agrupa por origen y reparte los grupos (de mayor a menor) en paquetes de tamaño parecido
+    grupos = {}
+    for indice, (origen, destino) in enumerate(consultas):
+        grupos.setdefault(origen, []).append((indice, destino))
+
+    tamano_objetivo = max(1, len(consultas) // max(1, num_tareas))
+    tareas = []
+    actual = []
+    tamano_actual = 0
+    for origen, grupo in sorted(grupos.items(), key=lambda item: len(item[1]), reverse=True):
+        actual.append((origen, grupo))
+        tamano_actual += len(grupo)
+        if tamano_actual >= tamano_objetivo:
+            tareas.append(actual)
+            actual = []
+            tamano_actual = 0
+    if actual:
+        tareas.append(actual)
+    return tareas
+
+
+class ParallelSearchExecutor:
+    """
+    Ejecuta lotes de consultas de ruta más barata en un pool de procesos.
+
+    El grafo se comparte con los trabajadores una sola vez al crear el pool, en el
+    inicializador (no se serializa en cada tarea). Se usa el método de arranque por
+    defecto de la plataforma: 'fork' (sin copia) en Linux hasta Python 3.13, 'spawn' en
+    Windows y macOS. Las consultas se agrupan por origen para que cada trabajador
+    calcule un solo árbol de rutas por aeropuerto de salida.
+    """
+
+    # Paquetes por proceso: más paquetes equilibran mejor la carga, menos reducen la comunicación
+    TAREAS_POR_PROCESO = 4
+
+    def __init__(self, grafo: dict[str, list[tuple[str, float]]], procesos: int | None = None):
+        self.grafo = grafo
+        self.procesos = procesos or os.cpu_count() or 1
+        self._pool = None
+        self._preparado = None
+
+        if self.procesos == 1:
+            # Sin pool: todo se ejecuta en el proceso actual
+            self._preparado = _preparar_grafo(grafo)
+            return
+
+        contexto = multiprocessing.get_context()
+        congelar = contexto.get_start_method() == 'fork' and gc.get_freeze_count() == 0
+        if congelar:
+            # Los trabajadores heredan el grafo; gc.freeze evita que su recolector toque
+            # esos objetos y fuerce copias de las páginas. Solo hace falta al hacer fork:
+            # el padre descongela enseguida y no altera lo que haya congelado otro código
+            gc.freeze()
+        try:
+            self._pool = contexto.Pool(self.procesos, initializer=_inicializar_trabajador, initargs=(grafo,))
+        finally:
+            if congelar:
+                gc.unfreeze()
+
+    def resolver(self, consultas: list[tuple[str, str]]) -> list[tuple[float, int, list[str]]]:
+        """Resuelve todas las consultas (origen, destino) y devuelve los resultados en el mismo orden."""
+        resultados = [None] * len(consultas)
+        for indice, resultado in self.resolver_a_medida(consultas):
+            resultados[indice] = resultado
+        return resultados
+
+    def resolver_a_medida(self, consultas: list[tuple[str, str]]):
+        """Genera (indice, resultado) a medida que los trabajadores terminan, sin orden garantizado."""
+        tareas = _particionar(consultas, self.procesos * self.TAREAS_POR_PROCESO)
+        if self._pool is None:
+            for tarea in tareas:
+                yield from _resolver_tarea(self._preparado, tarea)
+            return
+
+        for lote in self._pool.imap_unordered(_resolver_tarea_trabajador, tareas):
+            yield from lote
+
+    def cerrar(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+@trazado()
+def resolver_lote(grafo: dict[str, list[tuple[str, float]]],
+                  consultas: list[tuple[str, str]],
+                  procesos: int | None = None) -> list[tuple[float, int, list[str]]]:
+    with ParallelSearchExecutor(grafo, procesos) as ejecutor:
+        return ejecutor.resolver(consultas)
@@ -1,6 +1,10 @@
 from custom_priority_queue import CustomPriorityQueue # Importamos nuestra cola de prioridad personalizada
+import hashlib
+import heapq
+from tracing import trazado
 
 # Construye una representación de grafo a partir de las tarifas
+@trazado()
 def construir_grafo(tarifas, aeropuertos_permitidos):
     grafo = {aeropuerto: [] for aeropuerto in aeropuertos_permitidos}
     for origen, destino, precio in tarifas:
@@ -9,7 +13,22 @@ def construir_grafo(tarifas, aeropuertos_permitidos):
             grafo[destino].append((origen, precio))
     return grafo
 
-def encontrar_ruta_mas_barata(grafo, origen, destino):
+# Calcula una huella del grafo (aristas y precios) para saber si un resultado precalculado sigue siendo válido
+def firma_grafo(grafo):
+    aristas = sorted((origen, destino, precio) for origen, destinos in grafo.items() for destino, precio in destinos)
+    h = hashlib.sha1()
+    h.update(repr(sorted(grafo)).encode('utf-8'))
+    h.update(repr(aristas).encode('utf-8'))
+    return h.hexdigest()
+
+# `cancelacion` (opcional) es un CancellationToken: si se activa, la búsqueda lanza SearchCancelled
+# `indice` (opcional) es el IndiceGrafo de este grafo: si origen y destino están en componentes
+# distintas se responde de inmediato, sin recorrer la componente del origen
+@trazado()
+def encontrar_ruta_mas_barata(grafo, origen, destino, cancelacion=None, indice=None):
+    if indice is not None and not indice.conectados(origen, destino):
+        return float('inf'), 0, []
+
     cola_prioridad = CustomPriorityQueue() 
     
     distancias = {nodo: (float('inf'), float('inf')) for nodo in grafo}
@@ -20,6 +39,9 @@ def encontrar_ruta_mas_barata(grafo, origen, destino):
     cola_prioridad.push((0, 0, origen, [origen])) 
 
     while not cola_prioridad.is_empty(): 
+        if cancelacion is not None:
+            cancelacion.verificar()
+
         costo_actual, escalas_actuales, nodo_actual, ruta_actual = cola_prioridad.pop() 
 
         # si ya hemos encontrado una ruta mejor a este nodo, lo ignoramos
@@ -44,3 +66,85 @@ def encontrar_ruta_mas_barata(grafo, origen, destino):
                 
     # si no se enccuetrra una ruta al destino
     return float('inf'), 0, [] 
+
+
+# Misma búsqueda sobre ids enteros (RegistroAeropuertos.a_ids): `adyacencia[id]` son los
+# (id_destino, precio) de cada aeropuerto. Las distancias van en listas y la cola guarda
+# (costo, escalas, id) sin copiar la ruta; la ruta sale de los predecesores al final.
+# Esas tuplas nunca se repiten (solo se encola al mejorar), así que un heap las saca en el
+# mismo orden que CustomPriorityQueue sin reordenar la lista en cada push. Como los ids
+# siguen el orden alfabético de los códigos, los empates se resuelven igual y el resultado
+# (traducido con a_codigos) coincide con encontrar_ruta_mas_barata.
+@trazado()
+def encontrar_ruta_mas_barata_ids(adyacencia, origen, destino, cancelacion=None):
+    infinito = (float('inf'), float('inf'))
+    distancias = [infinito] * len(adyacencia)
+    distancias[origen] = (0, 0)
+    predecesores = [-1] * len(adyacencia)
+
+    cola_prioridad = [(0, 0, origen)]
+
+    while cola_prioridad:
+        if cancelacion is not None:
+            cancelacion.verificar()
+
+        costo_actual, escalas_actuales, nodo_actual = heapq.heappop(cola_prioridad)
+
+        if (costo_actual, escalas_actuales) > distancias[nodo_actual]:
+            continue
+
+        if nodo_actual == destino:
+            ruta = [destino]
+            while predecesores[ruta[-1]] != -1:
+                ruta.append(predecesores[ruta[-1]])
+            ruta.reverse()
+            return costo_actual, escalas_actuales, ruta
+
+        nuevas_escalas = escalas_actuales + 1
+        for vecino, precio_vuelo in adyacencia[nodo_actual]:
+            nuevo_costo = costo_actual + precio_vuelo
+            if (nuevo_costo, nuevas_escalas) < distancias[vecino]:
+                distancias[vecino] = (nuevo_costo, nuevas_escalas)
+                predecesores[vecino] = nodo_actual
+                heapq.heappush(cola_prioridad, (nuevo_costo, nuevas_escalas, vecino))
+
+    return float('inf'), 0, []
+
+
+# Ejecuta la misma búsqueda que encontrar_ruta_mas_barata pero sin detenerse en un destino:
+# devuelve {nodo: (costo, escalas, ruta)} para todos los nodos alcanzables desde el origen.
+# Como el recorrido es idéntico hasta cada extracción, cada resultado coincide con la consulta individual.
+# Igual que en encontrar_ruta_mas_barata_ids, la cola es un heap de (costo, escalas, nodo)
+# (tuplas que no se repiten: mismo orden de extracción que CustomPriorityQueue) y la ruta
+# de cada nodo se arma al extraerlo, a partir de la de su predecesor ya resuelto.
+@trazado()
+def arbol_rutas_mas_baratas(grafo, origen, cancelacion=None):
+    distancias = {nodo: (float('inf'), float('inf')) for nodo in grafo}
+    distancias[origen] = (0, 0)
+    predecesores = {origen: None}
+    resultados = {}
+
+    cola_prioridad = [(0, 0, origen)]
+
+    while cola_prioridad:
+        if cancelacion is not None:
+            cancelacion.verificar()
+
+        costo_actual, escalas_actuales, nodo_actual = heapq.heappop(cola_prioridad)
+
+        if (costo_actual, escalas_actuales) > distancias[nodo_actual]:
+            continue
+
+        predecesor = predecesores[nodo_actual]
+        ruta_actual = [nodo_actual] if predecesor is None else resultados[predecesor][2] + [nodo_actual]
+        resultados[nodo_actual] = (costo_actual, escalas_actuales, ruta_actual)
+
+        nuevas_escalas = escalas_actuales + 1
+        for vecino, precio_vuelo in grafo.get(nodo_actual, []):
+            nuevo_costo = costo_actual + precio_vuelo
+            if (nuevo_costo, nuevas_escalas) < distancias[vecino]:
+                distancias[vecino] = (nuevo_costo, nuevas_escalas)
+                predecesores[vecino] = nodo_actual
+                heapq.heappush(cola_prioridad, (nuevo_costo, nuevas_escalas, vecino))
+
+    return resultados
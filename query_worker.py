@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+
+from cancellation import CancellationToken, SearchCancelled
+
+
+class QueryWorker:
+    """
+    Ejecuta las consultas de la GUI en un hilo aparte para que la ventana no se congele.
+
+    Tk no es seguro entre hilos: el hilo de trabajo solo deja el resultado en una cola
+    y la ventana la revisa periódicamente con root.after, de modo que los callbacks
+    (al_terminar, al_fallar, al_cancelar) siempre se ejecutan en el hilo de Tk.
+    """
+
+    INTERVALO_SONDEO_MS = 50
+    # Clics repetidos de la misma consulta dentro de este intervalo se ignoran
+    ANTIREBOTE_S = 0.3
+
+    def __init__(self, root):
+        self.root = root
+        self._resultados = queue.Queue()
+        self._siguiente_id = 0
+        # Consulta en curso: (id, clave, token, callbacks) o None
+        self._actual = None
+        self._ultima_clave = None
+        self._ultimo_envio = 0.0
+        self._sondeando = False
+
+    @property
+    def ocupado(self) -> bool:
+        return self._actual is not None
+
+    def enviar(self, clave, tarea, al_terminar, al_fallar=None, al_cancelar=None) -> bool:
+        """
+        Lanza `tarea(token)` en segundo plano.
+
+        Args:
+            clave: Identifica la consulta (por ejemplo sus parámetros) para el antirrebote
+            tarea: Función que recibe un CancellationToken y devuelve el resultado
+            al_terminar: Recibe el resultado, en el hilo de Tk
+            al_fallar: Recibe la excepción si la tarea falló
+            al_cancelar: Se llama si la consulta se canceló
+
+        Returns:
+            bool: False si se ignoró por ser un duplicado de la consulta en curso o reciente
+        """
+        ahora = time.monotonic()
+        if clave == self._ultima_clave and (self.ocupado or ahora - self._ultimo_envio < self.ANTIREBOTE_S):
+            return False
+
+        # Una consulta distinta reemplaza a la que estaba en curso
+        self.cancelar()
+
+        self._siguiente_id += 1
+        token = CancellationToken()
+        self._actual = (self._siguiente_id, clave, token, (al_terminar, al_fallar, al_cancelar))
+        self._ultima_clave = clave
+        self._ultimo_envio = ahora
+
+        hilo = threading.Thread(target=self._ejecutar, args=(self._siguiente_id, tarea, token), daemon=True)
+        hilo.start()
+
+        if not self._sondeando:
+            self._sondeando = True
+            self.root.after(self.INTERVALO_SONDEO_MS, self._sondear)
+        return True
+
+    def cancelar(self) -> None:
+        """Cancela la consulta en curso (si hay una) y avisa por su callback al_cancelar."""
+        if self._actual is None:
+            return
+        _, _, token, (_, _, al_cancelar) = self._actual
+        token.cancelar()
+        self._actual = None
+        self._ultima_clave = None
+        if al_cancelar is not None:
+            al_cancelar()
+
+    def _ejecutar(self, id_consulta, tarea, token) -> None:
+        # Se ejecuta en el hilo de trabajo: no debe tocar ningún widget
+        try:
+            resultado = tarea(token)
+        except SearchCancelled:
+            return
+        except (Exception, SystemExit) as error:
+            # SystemExit: los cargadores de datos terminan el programa si falta un archivo
+            self._resultados.put((id_consulta, False, error))
+            return
+        self._resultados.put((id_consulta, True, resultado))
+
+    def _sondear(self) -> None:
+        while True:
+            try:
+                id_consulta, exito, valor = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+
+            # Resultados de consultas canceladas o reemplazadas se descartan
+            if self._actual is None or self._actual[0] != id_consulta:
+                continue
+
+            _, _, _, (al_terminar, al_fallar, _) = self._actual
+            self._actual = None
+            if exito:
+                al_terminar(valor)
+            elif al_fallar is not None:
+                al_fallar(valor)
+
+        if self.ocupado:
+            self.root.after(self.INTERVALO_SONDEO_MS, self._sondear)
+        else:
+            self._sondeando = False
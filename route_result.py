@@ -0,0 +1,225 @@
+import json
+import struct
+
+from airport_registry import RegistroAeropuertos
+
+# Resultado de una búsqueda de ruta como dato estructurado, con serializadores para
+# quien consume muchos resultados (lotes, servidores):
+#   JSON        -> ResultadoRuta.a_json() / ResultadoRuta.desde_json()
+#   JSON Lines  -> escribir_jsonl() / leer_jsonl(), un resultado por línea
+#   binario     -> escribir_binario() / leer_binario(), registros de tamaño fijo + ids
+#
+# Formato binario (little-endian):
+#   cabecera: b"MTRR", versión (B), cantidad de códigos (H) y cada código como
+#             longitud (B) + UTF-8; los ids son su posición en esa tabla
+#   registro: tipo (B), id origen (H), id destino (H), costo (d), aeropuertos en la
+#             ruta n (H), n ids (H) y n-1 precios por segmento (d)
+
+TIPOS = ("barata", "escalas")
+
+MAGICO = b"MTRR"
+VERSION_BINARIO = 1
+_CABECERA = struct.Struct("<4sBH")
+_REGISTRO = struct.Struct("<BHHdH")
+MAX_CODIGOS_BINARIO = 0xFFFF
+
+
+class ResultadoRuta:
+    """
+    Resultado de una búsqueda: la ruta y el precio de cada segmento.
+
+    Guarda solo listas planas (ruta y precios); los segmentos, vuelos y escalas se
+    derivan al pedirlos. Sin ruta, `costo` es inf y `ruta` y `precios` están vacíos.
+    """
+
+    __slots__ = ('tipo', 'origen', 'destino', 'costo', 'ruta', 'precios')
+
+    def __init__(self, tipo: str, origen: str, destino: str, costo: float,
+                 ruta: list[str], precios: list[float]):
+        self.tipo = tipo
+        self.origen = origen
+        self.destino = destino
+        self.costo = costo
+        self.ruta = ruta
+        self.precios = precios
+
+    @classmethod
+    def desde_busqueda(cls, tipo: str, origen: str, destino: str,
+                       resultado: tuple[float, int, list[str]],
+                       grafo: dict[str, list[tuple[str, float]]]) -> 'ResultadoRuta':
+        """
+        Construye el resultado a partir de la tupla (costo, escalas, ruta) de un buscador.
+
+        El precio de cada segmento es el vuelo que usó la búsqueda: el más barato entre
+        dos aeropuertos en la ruta más barata (Dijkstra) y el primero de la lista en la de
+        menos escalas (BFS), así la suma de precios es siempre el costo.
+        """
+        costo, _, ruta = resultado
+        precios = []
+        for origen_seg, destino_seg in zip(ruta, ruta[1:]):
+            candidatos = [precio for vecino, precio in grafo.get(origen_seg, []) if vecino == destino_seg]
+            precios.append(candidatos[0] if tipo == "escalas" else min(candidatos))
+        return cls(tipo, origen, destino, costo, list(ruta), precios)
+
+    @property
+    def encontrada(self) -> bool:
+        return bool(self.ruta)
+
+    @property
+    def vuelos(self) -> int:
+        return max(0, len(self.ruta) - 1)
+
+    @property
+    def escalas(self) -> int:
+        return max(0, len(self.ruta) - 2)
+
+    @property
+    def segmentos(self) -> list[tuple[str, str, float]]:
+        """[(origen, destino, precio), ...] de cada vuelo de la ruta."""
+        return list(zip(self.ruta, self.ruta[1:], self.precios))
+
+    def __eq__(self, otro):
+        if not isinstance(otro, ResultadoRuta):
+            return NotImplemented
+        return all(getattr(self, campo) == getattr(otro, campo) for campo in self.__slots__)
+
+    def __repr__(self):
+        return (f"ResultadoRuta({self.tipo!r}, {self.origen!r}, {self.destino!r}, "
+                f"{self.costo!r}, {self.ruta!r}, {self.precios!r})")
+
+    def a_dict(self) -> dict:
+        # JSON no admite inf: sin ruta el costo se escribe como null
+        return {
+            'tipo': self.tipo,
+            'origen': self.origen,
+            'destino': self.destino,
+            'costo': self.costo if self.ruta else None,
+            'escalas': self.escalas,
+            'ruta': self.ruta,
+            'precios': self.precios,
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: dict) -> 'ResultadoRuta':
+        costo = datos['costo']
+        return cls(datos['tipo'], datos['origen'], datos['destino'],
+                   float('inf') if costo is None else costo, datos['ruta'], datos['precios'])
+
+    def a_json(self) -> str:
+        return json.dumps(self.a_dict(), ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def desde_json(cls, texto: str) -> 'ResultadoRuta':
+        return cls.desde_dict(json.loads(texto))
+
+
+def escribir_jsonl(resultados, archivo) -> int:
+    """
+    Escribe un resultado JSON por línea en un archivo de texto abierto.
+
+    Returns:
+        int: Cantidad de resultados escritos
+    """
+    cantidad = 0
+    for resultado in resultados:
+        archivo.write(resultado.a_json())
+        archivo.write("\n")
+        cantidad += 1
+    return cantidad
+
+
+def leer_jsonl(archivo):
+    """Genera los resultados de un archivo JSON Lines abierto (ignora líneas vacías)."""
+    for linea in archivo:
+        if linea.strip():
+            yield ResultadoRuta.desde_json(linea)
+
+
+def escribir_binario(resultados, archivo, registro: RegistroAeropuertos | None = None) -> int:
+    """
+    Escribe los resultados en formato binario en un archivo abierto en modo 'wb'.
+
+    Args:
+        resultados: Iterable de ResultadoRuta
+        archivo: Archivo binario abierto para escritura
+        registro (RegistroAeropuertos, optional): Códigos de la tabla de la cabecera. Con
+            él los resultados se escriben a medida que llegan; sin él se recorren una vez
+            antes para reunir los códigos
+
+    Returns:
+        int: Cantidad de resultados escritos
+
+    Raises:
+        ValueError: Si hay más de MAX_CODIGOS_BINARIO códigos o un tipo desconocido
+        KeyError: Si un resultado usa un aeropuerto que no está en el registro
+    """
+    if registro is None:
+        resultados = list(resultados)
+        codigos = set()
+        for resultado in resultados:
+            codigos.update((resultado.origen, resultado.destino))
+            codigos.update(resultado.ruta)
+        registro = RegistroAeropuertos(codigos)
+    if len(registro) > MAX_CODIGOS_BINARIO:
+        raise ValueError(f"El formato binario admite hasta {MAX_CODIGOS_BINARIO} aeropuertos")
+
+    cabecera = [_CABECERA.pack(MAGICO, VERSION_BINARIO, len(registro))]
+    for codigo in registro.codigos:
+        codificado = codigo.encode('utf-8')
+        cabecera.append(struct.pack("<B", len(codificado)) + codificado)
+    archivo.write(b"".join(cabecera))
+
+    ids = registro.ids
+    tipos = {tipo: numero for numero, tipo in enumerate(TIPOS)}
+    cantidad = 0
+    for resultado in resultados:
+        if resultado.tipo not in tipos:
+            raise ValueError(f"Tipo de búsqueda desconocido: {resultado.tipo!r}")
+        n = len(resultado.ruta)
+        archivo.write(_REGISTRO.pack(tipos[resultado.tipo], ids[resultado.origen], ids[resultado.destino],
+                                     resultado.costo, n))
+        if n:
+            archivo.write(struct.pack(f"<{n}H{n - 1}d", *[ids[codigo] for codigo in resultado.ruta],
+                                      *resultado.precios))
+        cantidad += 1
+    return cantidad
+
+
+def _leer_exacto(archivo, tamano: int) -> bytes:
+    datos = archivo.read(tamano)
+    if len(datos) != tamano:
+        raise ValueError("Archivo binario de resultados truncado")
+    return datos
+
+
+def leer_binario(archivo):
+    """
+    Genera los resultados de un archivo binario abierto en modo 'rb'.
+
+    Raises:
+        ValueError: Si el archivo no tiene el formato esperado o está truncado
+    """
+    magico, version, num_codigos = _CABECERA.unpack(_leer_exacto(archivo, _CABECERA.size))
+    if magico != MAGICO or version != VERSION_BINARIO:
+        raise ValueError("No es un archivo binario de resultados de ruta")
+
+    codigos = []
+    for _ in range(num_codigos):
+        longitud = _leer_exacto(archivo, 1)[0]
+        codigos.append(_leer_exacto(archivo, longitud).decode('utf-8'))
+
+    while True:
+        fijo = archivo.read(_REGISTRO.size)
+        if not fijo:
+            return
+        if len(fijo) != _REGISTRO.size:
+            raise ValueError("Archivo binario de resultados truncado")
+        tipo, origen, destino, costo, n = _REGISTRO.unpack(fijo)
+        ruta = []
+        precios = []
+        if n:
+            formato = f"<{n}H{n - 1}d"
+            valores = struct.unpack(formato, _leer_exacto(archivo, struct.calcsize(formato)))
+            ruta = [codigos[i] for i in valores[:n]]
+            precios = list(valores[n:])
+        yield ResultadoRuta(TIPOS[tipo], codigos[origen], codigos[destino], costo, ruta, precios)
@@ -0,0 +1,305 @@
+import math
+from xml.sax.saxutils import escape, quoteattr
+
+from tracing import trazado
+
+# cairosvg es opcional: solo se necesita para exportar a PNG
+try:
+    import cairosvg
+except (ImportError, OSError):  # OSError: paquete instalado pero sin la biblioteca cairo
+    cairosvg = None
+
+
+class SVGCanvas:
+    """
+    Lienzo sin ventana que imita la parte de tkinter.Canvas que usan los visualizadores
+    (create_line, create_oval, create_text, create_rectangle, bbox, delete, itemconfig,
+    tag_lower, tag_raise, ...) y produce un documento SVG.
+
+    Permite ejecutar el mismo código de dibujado de GraphVisualizer y
+    CompleteGraphVisualizer en un servidor, sin pantalla ni Tk.
+    """
+
+    def __init__(self, width: int = 800, height: int = 600, bg: str = "white"):
+        self.ancho = width
+        self.alto = height
+        self.origen_x = 0
+        self.origen_y = 0
+        self.fondo = bg
+        # {id: [tipo, coordenadas, opciones, tags]}; el orden del dict es el orden Z
+        self._items: dict[int, list] = {}
+        self._siguiente_id = 1
+
+    # ------------------------------------------------------------------
+    # Creación de elementos
+    # ------------------------------------------------------------------
+
+    def _crear(self, tipo, coordenadas, opciones):
+        if len(coordenadas) == 1 and isinstance(coordenadas[0], (list, tuple)):
+            coordenadas = coordenadas[0]
+        tags = opciones.pop('tags', ())
+        if isinstance(tags, str):
+            tags = (tags,)
+        item_id = self._siguiente_id
+        self._siguiente_id += 1
+        self._items[item_id] = [tipo, [float(c) for c in coordenadas], opciones, tuple(tags)]
+        return item_id
+
+    def create_line(self, *coordenadas, **opciones):
+        return self._crear('line', coordenadas, opciones)
+
+    def create_oval(self, *coordenadas, **opciones):
+        return self._crear('oval', coordenadas, opciones)
+
+    def create_rectangle(self, *coordenadas, **opciones):
+        return self._crear('rectangle', coordenadas, opciones)
+
+    def create_text(self, *coordenadas, **opciones):
+        return self._crear('text', coordenadas, opciones)
+
+    # ------------------------------------------------------------------
+    # Consulta y modificación
+    # ------------------------------------------------------------------
+
+    def _resolver(self, referencia):
+        # Una referencia puede ser un id o un tag ("all" abarca todo), como en Tk
+        if isinstance(referencia, int):
+            return [referencia] if referencia in self._items else []
+        if referencia == "all":
+            return list(self._items)
+        return [item_id for item_id, item in self._items.items() if referencia in item[3]]
+
+    def find_withtag(self, referencia):
+        return tuple(self._resolver(referencia))
+
+    def delete(self, *referencias):
+        for referencia in referencias:
+            for item_id in self._resolver(referencia):
+                del self._items[item_id]
+
+    def itemconfig(self, referencia, **opciones):
+        if 'tags' in opciones:
+            tags = opciones.pop('tags')
+            opciones['tags'] = (tags,) if isinstance(tags, str) else tuple(tags)
+        for item_id in self._resolver(referencia):
+            item = self._items[item_id]
+            if 'tags' in opciones:
+                item[3] = opciones['tags']
+            item[2].update({clave: valor for clave, valor in opciones.items() if clave != 'tags'})
+
+    itemconfigure = itemconfig
+
+    def coords(self, referencia, *coordenadas):
+        ids = self._resolver(referencia)
+        if not coordenadas:
+            return list(self._items[ids[0]][1]) if ids else []
+        if len(coordenadas) == 1 and isinstance(coordenadas[0], (list, tuple)):
+            coordenadas = coordenadas[0]
+        for item_id in ids:
+            self._items[item_id][1] = [float(c) for c in coordenadas]
+
+    def bbox(self, *referencias):
+        cajas = [self._caja(self._items[item_id])
+                 for referencia in referencias for item_id in self._resolver(referencia)]
+        if not cajas:
+            return None
+        return (int(min(c[0] for c in cajas)), int(min(c[1] for c in cajas)),
+                int(math.ceil(max(c[2] for c in cajas))), int(math.ceil(max(c[3] for c in cajas))))
+
+    def _caja(self, item):
+        tipo, coordenadas, opciones, _ = item
+        if tipo == 'text':
+            ancho, alto = _medir_texto(opciones.get('text', ''), opciones.get('font'))
+            x, y = coordenadas[0], coordenadas[1]
+            anchor = opciones.get('anchor', 'center')
+            if anchor == 'center':
+                anchor = ''
+            x0 = x if 'w' in anchor else x - ancho if 'e' in anchor else x - ancho / 2
+            y0 = y if 'n' in anchor else y - alto if 's' in anchor else y - alto / 2
+            return x0, y0, x0 + ancho, y0 + alto
+        xs = coordenadas[0::2]
+        ys = coordenadas[1::2]
+        grosor = float(opciones.get('width', 1)) / 2
+        return min(xs) - grosor, min(ys) - grosor, max(xs) + grosor, max(ys) + grosor
+
+    def tag_raise(self, referencia, encima_de=None):
+        ids = self._resolver(referencia)
+        if encima_de is None:
+            # Al final del dict = encima de todo
+            for item_id in ids:
+                self._items[item_id] = self._items.pop(item_id)
+            return
+        self._reordenar(ids, self._resolver(encima_de)[-1], despues=True)
+
+    def tag_lower(self, referencia, debajo_de=None):
+        ids = self._resolver(referencia)
+        if debajo_de is None:
+            self._items = {**{item_id: self._items[item_id] for item_id in ids}, **{
+                item_id: item for item_id, item in self._items.items() if item_id not in ids}}
+            return
+        objetivo = self._resolver(debajo_de)[0]
+        recientes = reversed(self._items)
+        ultimo, penultimo = next(recientes, None), next(recientes, None)
+        if ids == [ultimo] and penultimo == objetivo:
+            # Caso habitual: el fondo de una etiqueta recién creado va justo debajo de ella
+            self._items[objetivo] = self._items.pop(objetivo)
+            return
+        self._reordenar(ids, objetivo, despues=False)
+
+    def _reordenar(self, ids, referencia, despues):
+        movidos = {item_id: self._items[item_id] for item_id in ids if item_id != referencia}
+        nuevos = {}
+        for item_id, item in self._items.items():
+            if item_id in movidos:
+                continue
+            if item_id == referencia and not despues:
+                nuevos.update(movidos)
+            nuevos[item_id] = item
+            if item_id == referencia and despues:
+                nuevos.update(movidos)
+        self._items = nuevos
+
+    # ------------------------------------------------------------------
+    # Compatibilidad con la vista de Tk (scroll, tamaño, eventos)
+    # ------------------------------------------------------------------
+
+    def config(self, **opciones):
+        # El área de scroll define el área exportada
+        if 'scrollregion' in opciones:
+            x0, y0, x1, y1 = opciones['scrollregion']
+            self.origen_x, self.origen_y = x0, y0
+            self.ancho, self.alto = x1 - x0, y1 - y0
+        if 'bg' in opciones:
+            self.fondo = opciones['bg']
+
+    configure = config
+
+    def cget(self, opcion):
+        return {'width': self.ancho, 'height': self.alto, 'bg': self.fondo}[opcion]
+
+    def canvasx(self, x):
+        return self.origen_x + x
+
+    def canvasy(self, y):
+        return self.origen_y + y
+
+    def winfo_width(self):
+        return self.ancho
+
+    def winfo_height(self):
+        return self.alto
+
+    def xview_moveto(self, fraccion):
+        pass
+
+    def yview_moveto(self, fraccion):
+        pass
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def after(self, ms, funcion=None, *args):
+        # Sin bucle de eventos no hay nada que programar: se ejecuta de inmediato
+        if funcion is not None:
+            funcion(*args)
+
+    # ------------------------------------------------------------------
+    # Exportación
+    # ------------------------------------------------------------------
+
+    def a_svg(self) -> str:
+        partes = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.ancho:g}" height="{self.alto:g}" '
+            f'viewBox="{self.origen_x:g} {self.origen_y:g} {self.ancho:g} {self.alto:g}">',
+            f'<rect x="{self.origen_x:g}" y="{self.origen_y:g}" width="{self.ancho:g}" '
+            f'height="{self.alto:g}" fill="{self.fondo}"/>',
+        ]
+        for item in self._items.values():
+            partes.append(_elemento_svg(item))
+        partes.append('</svg>')
+        return '\n'.join(partes)
+
+    @trazado()
+    def guardar(self, archivo: str) -> None:
+        with open(archivo, mode='w', encoding='utf-8') as f:
+            f.write(self.a_svg())
+
+    def guardar_png(self, archivo: str) -> None:
+        if cairosvg is None:
+            raise RuntimeError("Exportar a PNG requiere el paquete opcional 'cairosvg'")
+        cairosvg.svg2png(bytestring=self.a_svg().encode('utf-8'), write_to=archivo)
+
+
+def _fuente(font):
+    # Tk acepta fuentes como ("Arial", 10, "bold"); el tamaño está en puntos
+    if not font:
+        return "Arial", 10, ""
+    familia = font[0]
+    tamano = font[1] if len(font) > 1 else 10
+    estilo = " ".join(font[2:]) if len(font) > 2 else ""
+    return familia, tamano, estilo
+
+
+def _medir_texto(texto, font):
+    # Sin un motor de fuentes solo se puede estimar: ~0.6 em por carácter
+    _, tamano, _ = _fuente(font)
+    pixeles = tamano * 4 / 3
+    lineas = str(texto).split('\n')
+    return max(len(linea) for linea in lineas) * pixeles * 0.6, len(lineas) * pixeles * 1.2
+
+
+def _puntos_flecha(x1, y1, x2, y2, forma):
+    # Misma geometría que las flechas de Tk: arrowshape=(d1, d2, d3)
+    d1, d2, d3 = forma
+    longitud = math.hypot(x2 - x1, y2 - y1) or 1.0
+    ux, uy = (x2 - x1) / longitud, (y2 - y1) / longitud
+    px, py = -uy, ux
+    cuello = (x2 - ux * d1, y2 - uy * d1)
+    base = (x2 - ux * d2, y2 - uy * d2)
+    return [(x2, y2), (base[0] + px * d3, base[1] + py * d3), cuello,
+            (base[0] - px * d3, base[1] - py * d3)], cuello
+
+
+def _elemento_svg(item):
+    tipo, c, opciones, _ = item
+    if tipo == 'line':
+        color = opciones.get('fill', 'black')
+        grosor = opciones.get('width', 1)
+        flecha = opciones.get('arrow')
+        puntos = list(zip(c[0::2], c[1::2]))
+        extra = ''
+        if flecha in ('last', 'both') and len(puntos) >= 2:
+            poligono, cuello = _puntos_flecha(*puntos[-2], *puntos[-1], opciones.get('arrowshape', (8, 10, 3)))
+            puntos[-1] = cuello
+            extra = '<polygon points="{}" fill="{}"/>'.format(
+                ' '.join(f'{x:.1f},{y:.1f}' for x, y in poligono), color)
+        trazo = ' '.join(f'{x:.1f},{y:.1f}' for x, y in puntos)
+        return f'<polyline points="{trazo}" fill="none" stroke="{color}" stroke-width="{grosor}"/>{extra}'
+
+    if tipo == 'oval':
+        x0, y0, x1, y1 = c[:4]
+        return (f'<ellipse cx="{(x0 + x1) / 2:.1f}" cy="{(y0 + y1) / 2:.1f}" '
+                f'rx="{(x1 - x0) / 2:.1f}" ry="{(y1 - y0) / 2:.1f}" '
+                f'fill="{opciones.get("fill") or "none"}" stroke="{opciones.get("outline", "black")}" '
+                f'stroke-width="{opciones.get("width", 1)}"/>')
+
+    if tipo == 'rectangle':
+        x0, y0, x1, y1 = c[:4]
+        return (f'<rect x="{x0:.1f}" y="{y0:.1f}" width="{x1 - x0:.1f}" height="{y1 - y0:.1f}" '
+                f'fill="{opciones.get("fill") or "none"}" stroke="{opciones.get("outline", "black")}" '
+                f'stroke-width="{opciones.get("width", 1)}"/>')
+
+    # Texto
+    familia, tamano, estilo = _fuente(opciones.get('font'))
+    anchor = opciones.get('anchor', 'center')
+    if anchor == 'center':
+        anchor = ''
+    alineacion = 'start' if 'w' in anchor else 'end' if 'e' in anchor else 'middle'
+    atributos = [f'x="{c[0]:.1f}"', f'y="{c[1]:.1f}"', f'font-family={quoteattr(familia)}',
+                 f'font-size="{tamano * 4 / 3:.1f}"', f'fill="{opciones.get("fill", "black")}"',
+                 f'text-anchor="{alineacion}"', 'dominant-baseline="central"']
+    if 'bold' in estilo:
+        atributos.append('font-weight="bold"')
+    if 'italic' in estilo:
+        atributos.append('font-style="italic"')
+    return f'<text {" ".join(atributos)}>{escape(str(opciones.get("text", "")))}</text>'
@@ -0,0 +1,33 @@
+import itertools
+import random
+import string
+
+
+# Genera códigos de tres letras al estilo IATA: AAA, AAB, AAC, ...
+def generar_codigos(cantidad):
+    codigos = (''.join(letras) for letras in itertools.product(string.ascii_uppercase, repeat=3))
+    return list(itertools.islice(codigos, cantidad))
+
+
+# Genera una red de tarifas aleatoria con el mismo formato que devuelve cargar_tarifas:
+# una lista de tuplas (origen, destino, precio). Las rutas conectan preferentemente
+# aeropuertos "cercanos" en la lista, lo que imita una red regional con algunos vuelos largos.
+def generar_tarifas(num_aeropuertos, rutas_por_aeropuerto=3, semilla=0, precio_min=10, precio_max=500):
+    rng = random.Random(semilla)
+    codigos = generar_codigos(num_aeropuertos)
+    tarifas = []
+    for i, origen in enumerate(codigos):
+        for _ in range(rutas_por_aeropuerto):
+            if rng.random() < 0.9:
+                j = min(num_aeropuertos - 1, max(0, i + rng.randint(-25, 25)))
+            else:
+                j = rng.randrange(num_aeropuertos)
+            if j != i:
+                tarifas.append((origen, codigos[j], float(rng.randint(precio_min, precio_max))))
+    return tarifas
+
+
+# Genera un mapa de visas {aeropuerto: requiere_visa} como el de visas.json
+def generar_visas(codigos, proporcion_con_visa=0.3, semilla=0):
+    rng = random.Random(semilla)
+    return {codigo: rng.random() < proporcion_con_visa for codigo in codigos}
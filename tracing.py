@@ -0,0 +1,209 @@
+import atexit
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+# Trazas opcionales del proceso de consulta, en formato Chrome trace-event
+# (se abren en chrome://tracing, Perfetto o speedscope).
+#
+# Se activan con variables de entorno:
+#   METRO_TRAVEL_TRAZA=traza.json   -> tramos de cada etapa (carga, grafo, búsqueda, dibujo)
+#   METRO_TRAVEL_PERFIL=1           -> además cProfile (traza.json.prof, para pstats/snakeviz)
+#   METRO_TRAVEL_MEMORIA=1          -> además tracemalloc (uso por tramo y traza.json.memoria.txt)
+# o desde main.py con --traza, --perfil y --memoria. Desactivado, cada tramo cuesta
+# solo la comprobación de una variable global.
+
+VARIABLE_TRAZA = "METRO_TRAVEL_TRAZA"
+VARIABLE_PERFIL = "METRO_TRAVEL_PERFIL"
+VARIABLE_MEMORIA = "METRO_TRAVEL_MEMORIA"
+# Proceso que escribe la traza: los procesos hijos (spawn) heredan el entorno pero no escriben
+VARIABLE_PID = "METRO_TRAVEL_TRAZA_PID"
+
+MAX_LINEAS_MEMORIA = 25
+
+_activo = False
+_archivo = None
+_eventos = []
+_cerrojo = threading.Lock()
+_hilos_nombrados = set()
+_local = threading.local()
+_perfiles = []
+_perfilar = False
+_memoria = False
+_foto_memoria_inicial = None
+
+
+def _ahora_us() -> int:
+    return time.perf_counter_ns() // 1000
+
+
+def activar(archivo: str, perfilar: bool = False, memoria: bool = False) -> None:
+    """
+    Empieza a registrar tramos. La traza se escribe en `archivo` con guardar()
+    o automáticamente al terminar el programa.
+    """
+    global _activo, _archivo, _perfilar, _memoria, _foto_memoria_inicial
+    with _cerrojo:
+        _eventos.clear()
+        _hilos_nombrados.clear()
+        _perfiles.clear()
+    _archivo = archivo
+    _perfilar = perfilar
+    _memoria = memoria
+    if memoria:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _foto_memoria_inicial = tracemalloc.take_snapshot()
+    os.environ[VARIABLE_PID] = str(os.getpid())
+    _activo = True
+
+
+def activa() -> bool:
+    return _activo
+
+
+def _nombrar_hilo() -> None:
+    hilo = threading.current_thread()
+    if hilo.ident in _hilos_nombrados:
+        return
+    _hilos_nombrados.add(hilo.ident)
+    _eventos.append({'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': hilo.ident,
+                     'args': {'name': hilo.name}})
+
+
+@contextlib.contextmanager
+def _tramo_activo(nombre, argumentos):
+    profundidad = getattr(_local, 'profundidad', 0)
+    perfil = None
+    if _perfilar and profundidad == 0:
+        # cProfile por hilo, activo durante el tramo más externo
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # Otra herramienta de perfilado ya está activa (Python 3.12+: una a la vez)
+            perfil = None
+
+    _local.profundidad = profundidad + 1
+    inicio = _ahora_us()
+    try:
+        yield
+    finally:
+        fin = _ahora_us()
+        _local.profundidad = profundidad
+        if perfil is not None:
+            perfil.disable()
+
+        evento = {'name': nombre, 'ph': 'X', 'ts': inicio, 'dur': fin - inicio,
+                  'pid': os.getpid(), 'tid': threading.get_ident()}
+        if argumentos:
+            evento['args'] = {clave: str(valor) for clave, valor in argumentos.items()}
+        with _cerrojo:
+            _nombrar_hilo()
+            _eventos.append(evento)
+            if perfil is not None:
+                _perfiles.append(perfil)
+            if _memoria:
+                actual, pico = tracemalloc.get_traced_memory()
+                _eventos.append({'name': 'memoria', 'ph': 'C', 'ts': fin, 'pid': os.getpid(),
+                                 'args': {'actual_kb': actual // 1024, 'pico_kb': pico // 1024}})
+
+
+def tramo(nombre: str, **argumentos):
+    """
+    Context manager que registra la duración de una etapa:
+
+        with tramo("construir_grafo", aeropuertos=len(permitidos)):
+            ...
+    """
+    if not _activo:
+        return contextlib.nullcontext()
+    return _tramo_activo(nombre, argumentos)
+
+
+def trazado(nombre: str = None):
+    """Decorador: registra cada llamada a la función como un tramo."""
+    def decorador(funcion):
+        etiqueta = nombre or funcion.__qualname__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _activo:
+                return funcion(*args, **kwargs)
+            with _tramo_activo(etiqueta, None):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def guardar() -> str | None:
+    """
+    Escribe la traza (y el perfil y el informe de memoria si se pidieron).
+
+    Returns:
+        str | None: Archivo de la traza, o None si no estaba activa
+    """
+    if not _activo or _archivo is None:
+        return None
+
+    with _cerrojo:
+        eventos = list(_eventos)
+        perfiles = list(_perfiles)
+
+    with open(_archivo, mode='w', encoding='utf-8') as f:
+        json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, f)
+
+    if perfiles:
+        estadisticas = pstats.Stats(perfiles[0])
+        for perfil in perfiles[1:]:
+            estadisticas.add(perfil)
+        estadisticas.dump_stats(_archivo + ".prof")
+
+    if _memoria and tracemalloc.is_tracing():
+        foto = tracemalloc.take_snapshot()
+        diferencias = foto.compare_to(_foto_memoria_inicial, 'lineno')
+        with open(_archivo + ".memoria.txt", mode='w', encoding='utf-8') as f:
+            actual, pico = tracemalloc.get_traced_memory()
+            f.write(f"Memoria actual: {actual / 1024:.1f} KiB, pico: {pico / 1024:.1f} KiB\n")
+            f.write("Mayores crecimientos desde que se activó la traza:\n")
+            for estadistica in diferencias[:MAX_LINEAS_MEMORIA]:
+                f.write(f"{estadistica}\n")
+
+    return _archivo
+
+
+def desactivar() -> str | None:
+    """Guarda la traza y deja de registrar tramos."""
+    global _activo
+    archivo = guardar()
+    _activo = False
+    if _memoria and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return archivo
+
+
+def _activar_desde_entorno() -> None:
+    archivo = os.environ.get(VARIABLE_TRAZA)
+    if not archivo:
+        return
+    pid = os.environ.get(VARIABLE_PID)
+    if pid is not None and pid != str(os.getpid()):
+        return
+    activar(archivo,
+            perfilar=os.environ.get(VARIABLE_PERFIL, "") not in ("", "0"),
+            memoria=os.environ.get(VARIABLE_MEMORIA, "") not in ("", "0"))
+
+
+def _guardar_al_salir() -> None:
+    if _activo and os.environ.get(VARIABLE_PID) == str(os.getpid()):
+        guardar()
+
+
+_activar_desde_entorno()
+atexit.register(_guardar_al_salir)
@@ -0,0 +1,254 @@
+import random
+import sys
+from collections import deque
+
+from airport_registry import RegistroAeropuertos
+from bfs_pathfinder import encontrar_ruta_menos_escalas_bfs
+from parallel_search import resolver_lote as resolver_lote_python
+from pathfinder import arbol_rutas_mas_baratas, construir_grafo, encontrar_ruta_mas_barata
+from synthetic_graphs import generar_codigos, generar_tarifas
+from tracing import trazado
+
+# NumPy y SciPy son opcionales: con ambos instalados los lotes se resuelven sobre una
+# matriz dispersa con scipy.sparse.csgraph; si falta alguno se usan los motores en Python
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse import csgraph
+except ImportError:
+    csr_matrix = None
+    csgraph = None
+
+DISPONIBLE = np is not None and csgraph is not None
+
+# Los pesos de csgraph son float64: enteros exactos hasta 2**53
+MAX_PESO_EXACTO = 2 ** 53
+# Orígenes por bloque al elegir predecesores (matrices de orígenes x aristas)
+MAX_CELDAS_BLOQUE = 4_000_000
+
+
+class VectorizedSearchBackend:
+    """
+    Grafo de tarifas como matriz dispersa para resolver muchos orígenes a la vez.
+
+    Para obtener exactamente lo mismo que encontrar_ruta_mas_barata (mínimo costo y, a
+    igual costo, menos vuelos) cada vuelo pesa `precio * M + 1`, con M mayor que el
+    máximo de vuelos posible: la distancia más corta de csgraph ordena primero por costo
+    y después por vuelos. Los empates restantes se resuelven como la cola de prioridad
+    de pathfinder: el predecesor es el de menor (costo, código), y los ids del registro
+    siguen el orden alfabético de los códigos.
+
+    Solo es exacto si todos los precios son enteros (las sumas en float no redondean);
+    si no, `exacto` es False y hay que usar los motores en Python.
+    """
+
+    def __init__(self, grafo: dict[str, list[tuple[str, float]]]):
+        nodos = set(grafo)
+        for conexiones in grafo.values():
+            nodos.update(destino for destino, _ in conexiones)
+        self.registro = RegistroAeropuertos(nodos)
+        ids = self.registro.ids
+        n = len(self.registro)
+        self.multiplicador = max(n, 1)
+
+        # Una arista por par (el menor precio; ante precios iguales, el primero en el grafo)
+        self._precios: dict[tuple[int, int], float] = {}
+        for origen, conexiones in grafo.items():
+            i = ids[origen]
+            for destino, precio in conexiones:
+                clave = (i, ids[destino])
+                if clave not in self._precios or precio < self._precios[clave]:
+                    self._precios[clave] = precio
+
+        precios = list(self._precios.values())
+        maximo = max(precios, default=0)
+        self.exacto = (DISPONIBLE
+                       and all(float(precio).is_integer() and precio >= 0 for precio in precios)
+                       and n * (maximo * self.multiplicador + 1) < MAX_PESO_EXACTO)
+        if not self.exacto:
+            return
+
+        pares = list(self._precios)
+        self._origenes = np.array([i for i, _ in pares], dtype=np.int64)
+        self._destinos = np.array([j for _, j in pares], dtype=np.int64)
+        self._pesos = np.array(precios, dtype=np.float64) * self.multiplicador + 1
+        self._matriz = csr_matrix((self._pesos, (self._origenes, self._destinos)), shape=(n, n))
+
+    def _distancias(self, indices):
+        return csgraph.dijkstra(self._matriz, directed=True, indices=indices)
+
+    def _predecesores(self, distancias):
+        """
+        Para cada (origen, nodo) elige, entre las aristas que cumplen d[u] + w = d[v],
+        la de menor (d[u], u): el mismo predecesor que deja la cola de prioridad.
+        """
+        num_origenes, n = distancias.shape
+        predecesores = np.full((num_origenes, n), -1, dtype=np.int64)
+        if len(self._pesos) == 0:
+            return predecesores
+
+        bloque = max(1, MAX_CELDAS_BLOQUE // len(self._pesos))
+        for inicio in range(0, num_origenes, bloque):
+            d = distancias[inicio:inicio + bloque]
+            d_u = d[:, self._origenes]
+            ajustadas = np.isfinite(d_u) & (d_u + self._pesos == d[:, self._destinos])
+            fila, arista = np.nonzero(ajustadas)
+            destino = self._destinos[arista]
+            d_pred = d_u[fila, arista]
+
+            # Menor distancia del predecesor y, entre esas, menor id
+            mejor = np.full(d.shape, np.inf)
+            np.minimum.at(mejor, (fila, destino), d_pred)
+            empatadas = d_pred == mejor[fila, destino]
+            candidato = np.full(d.shape, n, dtype=np.int64)
+            np.minimum.at(candidato, (fila[empatadas], destino[empatadas]), self._origenes[arista[empatadas]])
+            candidato[candidato == n] = -1
+            predecesores[inicio:inicio + bloque] = candidato
+        return predecesores
+
+    def _arbol(self, origen_id, distancias, predecesores):
+        # Se recorre por distancia creciente: el predecesor siempre ya está resuelto
+        codigos = self.registro.codigos
+        alcanzables = np.nonzero(np.isfinite(distancias))[0]
+        orden = alcanzables[np.argsort(distancias[alcanzables], kind='stable')]
+        resultados = {codigos[origen_id]: (0, 0, [codigos[origen_id]])}
+        for v in orden.tolist():
+            if v == origen_id:
+                continue
+            u = int(predecesores[v])
+            costo_u, escalas_u, ruta_u = resultados[codigos[u]]
+            resultados[codigos[v]] = (costo_u + self._precios[(u, v)], escalas_u + 1, ruta_u + [codigos[v]])
+        return resultados
+
+    @trazado()
+    def arboles(self, origenes: list[str]) -> dict[str, dict[str, tuple[float, int, list[str]]]]:
+        """Lo mismo que arbol_rutas_mas_baratas para cada origen, en un solo cálculo."""
+        conocidos = [origen for origen in dict.fromkeys(origenes) if origen in self.registro]
+        resultados = {origen: {origen: (0, 0, [origen])} for origen in origenes if origen not in self.registro}
+        if not conocidos:
+            return resultados
+
+        indices = np.array([self.registro.id(origen) for origen in conocidos], dtype=np.int64)
+        distancias = self._distancias(indices)
+        predecesores = self._predecesores(distancias)
+        for fila, origen in enumerate(conocidos):
+            resultados[origen] = self._arbol(int(indices[fila]), distancias[fila], predecesores[fila])
+        return resultados
+
+    def resolver(self, consultas: list[tuple[str, str]]) -> list[tuple[float, int, list[str]]]:
+        """Lo mismo que encontrar_ruta_mas_barata para cada (origen, destino)."""
+        arboles = self.arboles([origen for origen, _ in consultas])
+        sin_ruta = (float('inf'), 0, [])
+        return [arboles[origen].get(destino, sin_ruta) for origen, destino in consultas]
+
+    @trazado()
+    def niveles(self, origenes: list[str]) -> dict[str, dict[str, int]]:
+        """Vuelos mínimos (nivel BFS) desde cada origen hasta cada aeropuerto alcanzable."""
+        conocidos = [origen for origen in dict.fromkeys(origenes) if origen in self.registro]
+        resultados = {origen: {origen: 0} for origen in origenes if origen not in self.registro}
+        if not conocidos:
+            return resultados
+
+        indices = np.array([self.registro.id(origen) for origen in conocidos], dtype=np.int64)
+        saltos = csgraph.shortest_path(self._matriz, directed=True, unweighted=True, indices=indices)
+        codigos = self.registro.codigos
+        for fila, origen in enumerate(conocidos):
+            alcanzables = np.nonzero(np.isfinite(saltos[fila]))[0]
+            resultados[origen] = {codigos[v]: int(saltos[fila, v]) for v in alcanzables.tolist()}
+        return resultados
+
+
+def _niveles_python(grafo, origen):
+    niveles = {origen: 0}
+    cola = deque([origen])
+    while cola:
+        nodo = cola.popleft()
+        for vecino, _ in grafo.get(nodo, []):
+            if vecino not in niveles:
+                niveles[vecino] = niveles[nodo] + 1
+                cola.append(vecino)
+    return niveles
+
+
+def crear_backend(grafo: dict[str, list[tuple[str, float]]]) -> VectorizedSearchBackend | None:
+    """Backend vectorizado para el grafo, o None si falta NumPy/SciPy o no sería exacto."""
+    if not DISPONIBLE:
+        return None
+    backend = VectorizedSearchBackend(grafo)
+    return backend if backend.exacto else None
+
+
+@trazado()
+def resolver_lote(grafo: dict[str, list[tuple[str, float]]],
+                  consultas: list[tuple[str, str]],
+                  procesos: int | None = None) -> list[tuple[float, int, list[str]]]:
+    """
+    Resuelve un lote de consultas de ruta más barata con el backend vectorizado si se
+    puede; si no, con el pool de procesos de parallel_search. El resultado es el mismo.
+    """
+    backend = crear_backend(grafo)
+    if backend is None:
+        return resolver_lote_python(grafo, consultas, procesos)
+    return backend.resolver(consultas)
+
+
+@trazado()
+def niveles_bfs(grafo: dict[str, list[tuple[str, float]]],
+                origenes: list[str]) -> dict[str, dict[str, int]]:
+    """{origen: {aeropuerto: vuelos mínimos}} para cada origen, vectorizado si se puede."""
+    backend = crear_backend(grafo)
+    if backend is None:
+        return {origen: _niveles_python(grafo, origen) for origen in dict.fromkeys(origenes)}
+    return backend.niveles(origenes)
+
+
+def verificar_paridad(num_grafos: int = 30, semilla: int = 0) -> int:
+    """
+    Compara el backend vectorizado con los motores en Python sobre grafos aleatorios
+    (con empates de precio frecuentes y aeropuertos sin visa). Lanza AssertionError en
+    la primera diferencia.
+
+    Returns:
+        int: Cantidad de consultas comparadas
+    """
+    rng = random.Random(semilla)
+    comparadas = 0
+    for numero in range(num_grafos):
+        num_aeropuertos = rng.randint(2, 60)
+        codigos = generar_codigos(num_aeropuertos)
+        tarifas = generar_tarifas(num_aeropuertos, rutas_por_aeropuerto=rng.randint(1, 4),
+                                  semilla=rng.randrange(10 ** 6), precio_min=1, precio_max=rng.choice((3, 50, 500)))
+        permitidos = {codigo for codigo in codigos if rng.random() < 0.85}
+        grafo = construir_grafo(tarifas, permitidos)
+        origenes = rng.sample(codigos, min(len(codigos), 8))
+
+        backend = crear_backend(grafo)
+        if backend is not None:
+            arboles = backend.arboles(origenes)
+            for origen in origenes:
+                esperado = arbol_rutas_mas_baratas(grafo, origen)
+                assert arboles[origen] == esperado, f"Grafo {numero}: árbol distinto desde {origen}"
+        consultas = [(origen, destino) for origen in origenes for destino in codigos]
+        resultados = resolver_lote(grafo, consultas, procesos=1)
+        niveles = niveles_bfs(grafo, origenes)
+        for (origen, destino), resultado in zip(consultas, resultados):
+            assert resultado == encontrar_ruta_mas_barata(grafo, origen, destino), \
+                f"Grafo {numero}: ruta más barata distinta de {origen} a {destino}"
+            _, _, ruta_bfs = encontrar_ruta_menos_escalas_bfs(grafo, origen, destino)
+            vuelos = niveles[origen].get(destino)
+            if origen != destino and origen in grafo:
+                assert (vuelos is None) == (not ruta_bfs), f"Grafo {numero}: alcance BFS distinto de {origen} a {destino}"
+                assert vuelos is None or vuelos == len(ruta_bfs) - 1, \
+                    f"Grafo {numero}: nivel BFS distinto de {origen} a {destino}"
+            comparadas += 1
+    return comparadas
+
+
+if __name__ == "__main__":
+    motor = "NumPy/SciPy" if DISPONIBLE else "Python (NumPy/SciPy no disponibles)"
+    num_grafos = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    print(f"Paridad del backend vectorizado [{motor}]: {verificar_paridad(num_grafos)} consultas idénticas")
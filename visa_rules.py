@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+
+from airport_registry import RegistroAeropuertos
+
+
+class PerfilVisa:
+    """
+    Reglas de visa compiladas para un pasajero (nacionalidad + visas que posee).
+
+    Se guarda un byte por aeropuerto (id del aeropuerto en el registro), de modo
+    que saber si el pasajero puede entrar o hacer escala en un aeropuerto es O(1), sin
+    construir conjuntos por consulta.
+
+    `in` responde si el aeropuerto se puede usar en la ruta (al menos en tránsito) e
+    iterar devuelve esos aeropuertos, así que un perfil sirve directamente como
+    `aeropuertos_permitidos` de construir_grafo.
+    """
+
+    __slots__ = ('nacionalidad', 'visas', '_indices', '_aeropuertos', 'entrada', 'transito')
+
+    def __init__(self, nacionalidad: str | None, visas: frozenset, registro: RegistroAeropuertos,
+                 entrada: bytearray, transito: bytearray):
+        self.nacionalidad = nacionalidad
+        self.visas = visas
+        self._indices = registro.ids
+        self._aeropuertos = registro.codigos
+        self.entrada = entrada
+        self.transito = transito
+
+    @property
+    def clave(self) -> tuple[str | None, frozenset]:
+        return self.nacionalidad, self.visas
+
+    def __hash__(self):
+        return hash(self.clave)
+
+    def __eq__(self, otro):
+        return isinstance(otro, PerfilVisa) and self.clave == otro.clave
+
+    def puede_entrar(self, aeropuerto: str) -> bool:
+        """True si el pasajero puede empezar o terminar el viaje en el aeropuerto."""
+        i = self._indices.get(aeropuerto)
+        return i is not None and self.entrada[i] == 1
+
+    def puede_transitar(self, aeropuerto: str) -> bool:
+        """True si el pasajero puede hacer escala en el aeropuerto."""
+        i = self._indices.get(aeropuerto)
+        return i is not None and self.transito[i] == 1
+
+    __contains__ = puede_transitar
+
+    def __iter__(self):
+        transito = self.transito
+        return (a for i, a in enumerate(self._aeropuertos) if transito[i])
+
+    def __len__(self):
+        return sum(self.transito)
+
+
+class ReglasVisas:
+    """
+    Requisitos de visa por nacionalidad y país de destino.
+
+    Formato (reglas_visas.json):
+        {
+          "paises": {"CCS": "VEN", "AUA": "ABW", ...},
+          "nacionalidades": {
+            "VEN": {"visa_entrada": ["ABW", ...], "visa_transito": ["ABW", ...]},
+            ...
+          }
+        }
+
+    - visa_entrada: países donde esa nacionalidad necesita visa para entrar
+    - visa_transito: países donde la necesita incluso para hacer escala sin salir del
+      aeropuerto. Un país con visa de entrada pero sin visa de tránsito sirve de escala.
+    Con la visa del país (o siendo su nacional) se puede entrar y transitar.
+    """
+
+    # Nacionalidad que representa el archivo visas.json (un solo requisito por aeropuerto).
+    # Es None porque las claves de reglas_visas.json son siempre cadenas: ninguna
+    # nacionalidad del archivo puede confundirse con el perfil general
+    NACIONALIDAD_GENERAL = None
+
+    def __init__(self, paises: dict[str, str], nacionalidades: dict[str, dict],
+                 registro: RegistroAeropuertos | None = None):
+        """
+        Args:
+            paises (dict): {aeropuerto: país}
+            nacionalidades (dict): Reglas por nacionalidad (ver arriba)
+            registro (RegistroAeropuertos, optional): Registro compartido con el grafo; los
+                aeropuertos del registro que no tienen país quedan siempre prohibidos
+        """
+        self.paises = paises
+        self.nacionalidades = nacionalidades
+        self.registro = registro if registro is not None else RegistroAeropuertos(paises)
+        self._perfiles = {}
+        self._cerrojo = threading.Lock()
+
+    def con_registro(self, registro: RegistroAeropuertos) -> 'ReglasVisas':
+        """Las mismas reglas, con los bitsets indexados por otro registro."""
+        return ReglasVisas(self.paises, self.nacionalidades, registro)
+
+    @classmethod
+    def desde_visas_simples(cls, visas: dict[str, bool],
+                            registro: RegistroAeropuertos | None = None) -> 'ReglasVisas':
+        """
+        Traduce visas.json ({aeropuerto: requiere_visa}): cada aeropuerto es su propio
+        "país" y sin visa no se puede ni entrar ni hacer escala en él, como hasta ahora.
+        """
+        con_visa = [aeropuerto for aeropuerto, requiere in visas.items() if requiere]
+        regla = {'visa_entrada': con_visa, 'visa_transito': con_visa}
+        return cls({aeropuerto: aeropuerto for aeropuerto in visas}, {cls.NACIONALIDAD_GENERAL: regla}, registro)
+
+    def paises_con_visa(self, nacionalidad: str | None) -> frozenset:
+        """Países para los que esa nacionalidad necesita visa (de entrada o de tránsito)."""
+        regla = self.nacionalidades[nacionalidad]
+        return frozenset(regla.get('visa_entrada', ())) | frozenset(regla.get('visa_transito', ()))
+
+    def perfil(self, nacionalidad: str | None, visas=()) -> PerfilVisa:
+        """
+        Compila (o reutiliza) el perfil de un pasajero.
+
+        Args:
+            nacionalidad (str | None): Clave de `nacionalidades` (NACIONALIDAD_GENERAL en
+                las reglas de visas.json)
+            visas: Países para los que el pasajero tiene visa
+
+        Returns:
+            PerfilVisa: Perfil compilado, compartido entre consultas
+
+        Raises:
+            KeyError: Si la nacionalidad no tiene reglas
+        """
+        visas = frozenset(visas)
+        clave = (nacionalidad, visas)
+        with self._cerrojo:
+            perfil = self._perfiles.get(clave)
+            if perfil is None:
+                perfil = self._compilar(nacionalidad, visas)
+                self._perfiles[clave] = perfil
+            return perfil
+
+    def _compilar(self, nacionalidad: str | None, visas: frozenset) -> PerfilVisa:
+        regla = self.nacionalidades[nacionalidad]
+        visa_entrada = set(regla.get('visa_entrada', ())) - visas - {nacionalidad}
+        visa_transito = set(regla.get('visa_transito', ())) - visas - {nacionalidad}
+
+        entrada = bytearray(len(self.registro))
+        transito = bytearray(len(self.registro))
+        for i, aeropuerto in enumerate(self.registro.codigos):
+            pais = self.paises.get(aeropuerto)
+            if pais is None:
+                continue
+            if pais not in visa_entrada:
+                entrada[i] = 1
+            # Quien puede entrar también puede hacer escala
+            if entrada[i] or pais not in visa_transito:
+                transito[i] = 1
+
+        return PerfilVisa(nacionalidad, visas, self.registro, entrada, transito)
+
+
+def leer_reglas_visas(archivo_reglas: str = "reglas_visas.json") -> ReglasVisas:
+    """
+    Lee las reglas por nacionalidad.
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+        json.JSONDecodeError: Si el archivo no es JSON válido
+    """
+    with open(archivo_reglas, mode='r', encoding='utf-8') as f:
+        datos = json.load(f)
+    return ReglasVisas(datos.get('paises', {}), datos.get('nacionalidades', {}))
+
+
+def cargar_reglas_visas(archivo_reglas: str = "reglas_visas.json") -> ReglasVisas | None:
+    """
+    Carga las reglas por nacionalidad. Devuelve None si el archivo no existe: las
+    consultas siguen funcionando solo con visas.json.
+    """
+    if not os.path.exists(archivo_reglas):
+        return None
+    try:
+        return leer_reglas_visas(archivo_reglas)
+    except json.JSONDecodeError:
+        print(f"Error: El archivo '{archivo_reglas}' no tiene un formato JSON válido.")
+        return None